@@ -2,6 +2,8 @@
 
 from dataclasses import dataclass, field
 
+import numpy as np
+
 from adaptive.performance_tracker import PerformanceTracker, StrategyMetrics
 from config import settings
 from utils.logger import setup_logger
@@ -9,7 +11,7 @@ from utils.logger import setup_logger
 logger = setup_logger("adaptive_controller")
 
 
-@dataclass
+@dataclass(slots=True)
 class AdaptiveOverrides:
     """Parameter overrides computed from live performance."""
     min_confidence: dict[str, float] = field(default_factory=dict)     # per-strategy
@@ -28,6 +30,16 @@ _DEFAULT_CONFIDENCE = {
 }
 
 
+# Piecewise-linear response curves (x breakpoints, y values); np.interp holds
+# the end values flat outside the breakpoints.
+# Win rate -> confidence adjustment: -0.10 by 65% WR, +0.05 by 25% WR
+_WR_CONFIDENCE_CURVE = ([0.25, 0.40, 0.50, 0.65], [0.05, 0.0, 0.0, -0.10])
+# Profit factor -> size scale: 0.5x floor at PF<=0.5, 1.0x at PF 1.0, 1.2x from PF 1.5
+_PF_SIZE_CURVE = ([0.5, 1.0, 1.5], [0.5, 1.0, 1.2])
+# Win rate -> SL multiplier factor: 15% wider by 20% WR, 10% tighter by 65% WR
+_WR_SL_CURVE = ([0.20, 0.35, 0.50, 0.65], [1.15, 1.0, 1.0, 0.90])
+
+
 class AdaptiveController:
     """
     Converts PerformanceTracker metrics into bounded parameter overrides.
@@ -40,15 +52,27 @@ class AdaptiveController:
 
     def __init__(self, tracker: PerformanceTracker):
         self.tracker = tracker
+        self._overrides: tuple[int, AdaptiveOverrides] | None = None  # (tracker version, overrides)
+
+    def _get_metrics(self) -> tuple[dict[str, StrategyMetrics], StrategyMetrics]:
+        """Per-strategy and overall metrics (memoized by the tracker until the next trade)."""
+        strategy_metrics = {
+            strat: self.tracker.get_strategy_metrics(strat)
+            for strat in ["momentum", "mean_reversion", "breakout"]
+        }
+        return strategy_metrics, self.tracker.get_overall_metrics()
 
     def compute_overrides(self) -> AdaptiveOverrides:
-        """Main entry point — compute all overrides from current metrics."""
-        overall = self.tracker.get_overall_metrics()
+        """
+        Main entry point — compute all overrides from current metrics.
+        The result is shared until the next recorded trade; callers only read it.
+        """
+        cached = self._overrides
+        if cached is not None and cached[0] == self.tracker.version:
+            return cached[1]
 
-        strategies = ["momentum", "mean_reversion", "breakout"]
-        strategy_metrics = {}
-        for strat in strategies:
-            strategy_metrics[strat] = self.tracker.get_strategy_metrics(strat)
+        strategy_metrics, overall = self._get_metrics()
+        strategies = list(strategy_metrics)
 
         overrides = AdaptiveOverrides()
 
@@ -64,6 +88,7 @@ class AdaptiveController:
 
         overrides.leverage_scale = self._compute_leverage_scale(overall)
 
+        self._overrides = (self.tracker.version, overrides)
         return overrides
 
     def _compute_confidence(self, strategy: str, metrics: StrategyMetrics, has_data: bool) -> float:
@@ -78,17 +103,8 @@ class AdaptiveController:
         if not has_data:
             return base
 
-        adjustment = 0.0
-
         # Win rate adjustment: WR > 50% -> lower; WR < 40% -> raise
-        if metrics.win_rate > 0.50:
-            # Scale down by up to 0.10 as WR approaches 65%
-            wr_excess = min(metrics.win_rate - 0.50, 0.15) / 0.15
-            adjustment -= 0.10 * wr_excess
-        elif metrics.win_rate < 0.40:
-            # Scale up by up to 0.05 as WR approaches 25%
-            wr_deficit = min(0.40 - metrics.win_rate, 0.15) / 0.15
-            adjustment += 0.05 * wr_deficit
+        adjustment = float(np.interp(metrics.win_rate, *_WR_CONFIDENCE_CURVE))
 
         # Profit factor bonus: PF > 1.5 -> slight loosening
         if metrics.profit_factor > 1.5:
@@ -119,21 +135,9 @@ class AdaptiveController:
         if not has_data:
             return 1.0
 
-        scale = 1.0
-
         # Profit factor scaling — moderate upscaling for winners
-        if metrics.profit_factor > 1.5:
-            scale = 1.2
-        elif metrics.profit_factor > 1.0:
-            # PF 1.0->1.0x, PF 1.5->1.2x
-            pf_excess = (metrics.profit_factor - 1.0) / 0.5
-            scale = 1.0 + 0.2 * pf_excess
-        elif metrics.profit_factor > 0.5:
-            # T55: PF 0.5->0.5x, PF 1.0->1.0x (was 0.3x->1.0x)
-            pf_pos = (metrics.profit_factor - 0.5) / 0.5
-            scale = 0.5 + 0.5 * pf_pos
-        else:
-            scale = 0.50  # T55: PF<0.5 floor 0.25 -> 0.50
+        # T55: PF<0.5 floor 0.25 -> 0.50, PF 0.5->1.0 ramp was 0.3x->1.0x
+        scale = float(np.interp(metrics.profit_factor, *_PF_SIZE_CURVE))
 
         # Losing streak penalty: 4+ consecutive losses -> halve
         if metrics.current_streak <= -4:
@@ -206,16 +210,8 @@ class AdaptiveController:
         if not has_data:
             return base
 
-        # WR > 50% -> tighten stops
-        if metrics.win_rate > 0.50:
-            wr_excess = min(metrics.win_rate - 0.50, 0.15) / 0.15
-            result = base - (base * 0.10) * wr_excess
-        # WR < 35% -> widen stops
-        elif metrics.win_rate < 0.35:
-            wr_deficit = min(0.35 - metrics.win_rate, 0.15) / 0.15
-            result = base + (base * 0.15) * wr_deficit
-        else:
-            result = base
+        # WR > 50% -> tighten stops; WR < 35% -> widen stops
+        result = base * float(np.interp(metrics.win_rate, *_WR_SL_CURVE))
 
         floor = max(0.6, base * 0.75)
         ceiling = min(2.5, base * 1.5)
@@ -253,20 +249,20 @@ class AdaptiveController:
     def format_state(self, overrides: AdaptiveOverrides) -> str:
         """Format current adaptive state for logging."""
         lines = ["ADAPTIVE STATE:"]
+        strategy_metrics, overall = self._get_metrics()
 
         for strat in ["momentum", "mean_reversion", "breakout"]:
             conf = overrides.min_confidence.get(strat, 0.0)
             size = overrides.position_size_scale.get(strat, 1.0)
             sl = overrides.sl_atr_multiplier.get(strat, 1.5)
             rr = overrides.rr_ratio.get(strat, 2.0)
-            metrics = self.tracker.get_strategy_metrics(strat)
+            metrics = strategy_metrics[strat]
             lines.append(
                 f"  {strat:<16} conf={conf:.2f} size={size:.2f}x SL={sl:.2f} R:R={rr:.2f} | "
                 f"WR={metrics.win_rate:.0%} PF={metrics.profit_factor:.2f} "
                 f"trades={metrics.trade_count} streak={metrics.current_streak:+d}"
             )
 
-        overall = self.tracker.get_overall_metrics()
         lines.append(
             f"  OVERALL         lev={overrides.leverage_scale:.2f}x | "
             f"WR={overall.win_rate:.0%} PF={overall.profit_factor:.2f} "
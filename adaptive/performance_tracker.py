@@ -3,11 +3,14 @@
 from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 
 import numpy as np
 
+from utils.jit import njit
 
-@dataclass
+
+@dataclass(slots=True)
 class TradeRecord:
     """Minimal record of a closed trade for adaptive tracking."""
     strategy: str
@@ -23,7 +26,7 @@ class TradeRecord:
     reward: float        # $ reward (TP - entry) * qty
 
 
-@dataclass
+@dataclass(slots=True)
 class StrategyMetrics:
     """Computed metrics for a strategy (or overall)."""
     trade_count: int = 0
@@ -38,6 +41,122 @@ class StrategyMetrics:
     recent_trend: float = 0.0      # -1.0 to +1.0 (slope of recent PnL)
 
 
+@lru_cache(maxsize=None)
+def _trend_weights(n: int) -> np.ndarray:
+    """
+    Least-squares weights for the slope of y against x = i/n:
+    slope = dot(w, y) with w = (i - mean_i) / ((n^2 - 1) / 12).
+    Only depends on the window length, so it is built once per n.
+    """
+    if n < 3:
+        weights = np.zeros(n)  # trend is undefined below 3 trades
+    else:
+        weights = (np.arange(n) - (n - 1) / 2.0) / ((n * n - 1) / 12.0)
+    weights.flags.writeable = False
+    return weights
+
+
+@njit(cache=True)
+def _window_shape_nb(pnl, weights):
+    """
+    One pass over a window's PnL (oldest first): longest run of pnl <= 0 and
+    the normalized cumulative-PnL slope clamped to [-1, +1] (0 if < 3 trades
+    or a flat curve).
+    """
+    n = len(pnl)
+    max_losing = 0
+    current_losing = 0
+    running = 0.0
+    y_min = np.inf
+    y_max = -np.inf
+    weighted = 0.0
+    for i in range(n):
+        if pnl[i] <= 0:
+            current_losing += 1
+            if current_losing > max_losing:
+                max_losing = current_losing
+        else:
+            current_losing = 0
+        running += pnl[i]
+        y_min = min(y_min, running)
+        y_max = max(y_max, running)
+        weighted += weights[i] * running
+
+    if n < 3 or y_max - y_min < 1e-10:
+        return max_losing, 0.0
+    # The y_min shift of the normalization drops out because the weights sum to 0
+    slope = weighted / (y_max - y_min)
+    return max_losing, max(-1.0, min(1.0, slope))
+
+
+@dataclass(slots=True)
+class _WindowSums:
+    """Running aggregates over a rolling trade window, updated as trades enter and leave."""
+    win_count: int = 0
+    neg_count: int = 0             # strictly negative PnL (break-evens count as losses but add nothing)
+    total_pnl: float = 0.0
+    gross_profit: float = 0.0
+    loss_pnl: float = 0.0          # sum of non-positive PnL (<= 0)
+    rr_sum: float = 0.0
+    rr_count: int = 0
+    rr_nonzero: int = 0
+
+    def add(self, trade: TradeRecord, sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) a trade's contribution."""
+        self.total_pnl += sign * trade.pnl
+        if trade.pnl > 0:
+            self.win_count += sign
+            self.gross_profit += sign * trade.pnl
+        elif trade.pnl < 0:
+            self.neg_count += sign
+            self.loss_pnl += sign * trade.pnl
+        if trade.risk > 0:
+            rr = abs(trade.pnl) / trade.risk
+            self.rr_sum += sign * (rr if trade.pnl > 0 else -rr)
+            self.rr_count += sign
+            if rr != 0:
+                self.rr_nonzero += sign
+
+        # Add/remove rounding must not leave a residue once a sum has no terms
+        # (e.g. PF has to go back to inf when the last loss is evicted)
+        if self.win_count == 0:
+            self.gross_profit = 0.0
+        if self.neg_count == 0:
+            self.loss_pnl = 0.0
+        if self.win_count + self.neg_count == 0:
+            self.total_pnl = 0.0
+        if self.rr_nonzero == 0:
+            self.rr_sum = 0.0
+
+
+class _PnlRing:
+    """
+    Fixed-capacity ring buffer of trade PnL; values() returns oldest first.
+    Every value is written twice (slot i and i + capacity) so the window is
+    always one contiguous slice and reads never copy.
+    """
+
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        self._buf = np.empty(2 * capacity, dtype=np.float64)
+        self._head = 0   # next slot to write
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, pnl: float):
+        self._buf[self._head] = pnl
+        self._buf[self._head + self._capacity] = pnl
+        self._head = (self._head + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
+
+    def values(self) -> np.ndarray:
+        if self._size < self._capacity:
+            return self._buf[:self._size]
+        return self._buf[self._head:self._head + self._capacity]
+
+
 class PerformanceTracker:
     """
     Records closed trades in rolling windows and computes live performance metrics.
@@ -52,11 +171,20 @@ class PerformanceTracker:
         self._trades: dict[str, deque[TradeRecord]] = {}
         # Global rolling window
         self._all_trades: deque[TradeRecord] = deque(maxlen=lookback_trades)
+        # Running sums and PnL ring buffers matching the windows above
+        self._sums: dict[str, _WindowSums] = {}
+        self._all_sums = _WindowSums()
+        self._pnl: dict[str, _PnlRing] = {}
+        self._all_pnl = _PnlRing(lookback_trades)
         # Streak tracking per strategy
         self._streaks: dict[str, int] = {}
         # Overall streak
         self._overall_streak: int = 0
         self._overall_max_losing: int = 0
+        # Metrics memoized until the next trade (key None = overall)
+        self._metrics_cache: dict[str | None, StrategyMetrics] = {}
+        # Bumped on every recorded trade so consumers can memoize derived state
+        self.version = 0
 
     def load_state(self, trades: list[dict]):
         """Replay historical trades from DB into rolling deques (startup recovery)."""
@@ -86,92 +214,81 @@ class PerformanceTracker:
         # Initialize deque for new strategy
         if strategy not in self._trades:
             self._trades[strategy] = deque(maxlen=self.lookback)
+            self._sums[strategy] = _WindowSums()
+            self._pnl[strategy] = _PnlRing(self.lookback)
             self._streaks[strategy] = 0
 
-        self._trades[strategy].append(trade)
-        self._all_trades.append(trade)
+        self._push(self._trades[strategy], self._sums[strategy], trade)
+        self._push(self._all_trades, self._all_sums, trade)
+        self._pnl[strategy].push(trade.pnl)
+        self._all_pnl.push(trade.pnl)
+        self._metrics_cache.clear()
+        self.version += 1
+
+        # Update streaks: extend a run of the same sign, otherwise restart at +/-1
+        sign = 1 if trade.pnl > 0 else -1
+        streak = self._streaks[strategy]
+        self._streaks[strategy] = streak + sign if streak * sign > 0 else sign
+        streak = self._overall_streak
+        self._overall_streak = streak + sign if streak * sign > 0 else sign
+        self._overall_max_losing = max(self._overall_max_losing, -self._overall_streak)
 
-        # Update streaks
-        if trade.pnl > 0:
-            if self._streaks[strategy] > 0:
-                self._streaks[strategy] += 1
-            else:
-                self._streaks[strategy] = 1
-
-            if self._overall_streak > 0:
-                self._overall_streak += 1
-            else:
-                self._overall_streak = 1
-        else:
-            if self._streaks[strategy] < 0:
-                self._streaks[strategy] -= 1
-            else:
-                self._streaks[strategy] = -1
-
-            if self._overall_streak < 0:
-                self._overall_streak -= 1
-            else:
-                self._overall_streak = -1
-
-            self._overall_max_losing = max(
-                self._overall_max_losing, abs(self._overall_streak)
-            )
+    @staticmethod
+    def _push(window: deque[TradeRecord], sums: _WindowSums, trade: TradeRecord):
+        """Append to a rolling window, retiring the evicted trade from its sums."""
+        if len(window) == window.maxlen:
+            sums.add(window[0], -1)
+        window.append(trade)
+        sums.add(trade)
 
     def has_enough_data(self, strategy: str) -> bool:
         """Check if a strategy has enough trades for adaptation."""
-        trades = self._trades.get(strategy, deque())
-        return len(trades) >= self.min_trades
+        return len(self._trades.get(strategy, ())) >= self.min_trades
 
     def get_strategy_metrics(self, strategy: str) -> StrategyMetrics:
         """Compute metrics for a single strategy."""
-        trades = list(self._trades.get(strategy, deque()))
-        return self._compute_metrics(trades, self._streaks.get(strategy, 0))
+        metrics = self._metrics_cache.get(strategy)
+        if metrics is None:
+            if not self._trades.get(strategy):
+                metrics = StrategyMetrics()
+            else:
+                metrics = self._compute_metrics(
+                    self._pnl[strategy].values(), self._sums[strategy], self._streaks.get(strategy, 0)
+                )
+            self._metrics_cache[strategy] = metrics
+        return metrics
 
     def get_overall_metrics(self) -> StrategyMetrics:
         """Compute metrics across all strategies."""
-        trades = list(self._all_trades)
-        return self._compute_metrics(trades, self._overall_streak)
-
-    def _compute_metrics(self, trades: list[TradeRecord], streak: int) -> StrategyMetrics:
-        """Compute StrategyMetrics from a list of trades."""
-        if not trades:
-            return StrategyMetrics()
-
-        wins = [t for t in trades if t.pnl > 0]
-        losses = [t for t in trades if t.pnl <= 0]
-
-        trade_count = len(trades)
-        win_count = len(wins)
-        win_rate = win_count / trade_count if trade_count > 0 else 0.0
-
-        gross_profit = sum(t.pnl for t in wins)
-        gross_loss = abs(sum(t.pnl for t in losses))
+        metrics = self._metrics_cache.get(None)
+        if metrics is None:
+            if not self._all_trades:
+                metrics = StrategyMetrics()
+            else:
+                metrics = self._compute_metrics(self._all_pnl.values(), self._all_sums, self._overall_streak)
+            self._metrics_cache[None] = metrics
+        return metrics
+
+    def _compute_metrics(self, pnl: np.ndarray, sums: _WindowSums, streak: int) -> StrategyMetrics:
+        """Compute StrategyMetrics for a non-empty window (PnL oldest first + running sums)."""
+        trade_count = len(pnl)
+        win_count = sums.win_count
+        win_rate = win_count / trade_count
+
+        gross_profit = sums.gross_profit
+        gross_loss = abs(sums.loss_pnl)
         profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else (
             float("inf") if gross_profit > 0 else 1.0
         )
 
-        avg_pnl = sum(t.pnl for t in trades) / trade_count
-        total_pnl = sum(t.pnl for t in trades)
+        total_pnl = sums.total_pnl
+        avg_pnl = total_pnl / trade_count
 
         # Average R:R achieved
-        rr_values = []
-        for t in trades:
-            if t.risk > 0:
-                rr_values.append(abs(t.pnl) / t.risk if t.pnl > 0 else -(abs(t.pnl) / t.risk))
-        avg_rr = np.mean(rr_values) if rr_values else 0.0
+        avg_rr = sums.rr_sum / sums.rr_count if sums.rr_count else 0.0
 
-        # Max losing streak within this window
-        max_losing = 0
-        current_losing = 0
-        for t in trades:
-            if t.pnl <= 0:
-                current_losing += 1
-                max_losing = max(max_losing, current_losing)
-            else:
-                current_losing = 0
-
-        # Recent trend (normalized slope of cumulative PnL)
-        trend = self._compute_pnl_trend(trades)
+        # Max losing streak and recent trend (normalized slope of cumulative PnL)
+        max_losing, trend = _window_shape_nb(pnl, _trend_weights(trade_count))
 
         return StrategyMetrics(
             trade_count=trade_count,
@@ -179,50 +296,9 @@ class PerformanceTracker:
             win_rate=win_rate,
             profit_factor=profit_factor,
             avg_pnl=avg_pnl,
-            avg_rr_achieved=float(avg_rr),
+            avg_rr_achieved=avg_rr,
             total_pnl=total_pnl,
             current_streak=streak,
             max_losing_streak=max_losing,
             recent_trend=trend,
         )
-
-    @staticmethod
-    def _compute_pnl_trend(trades: list[TradeRecord]) -> float:
-        """
-        Compute normalized PnL trend via linear regression slope.
-        Returns value in [-1, +1].
-        """
-        if len(trades) < 3:
-            return 0.0
-
-        # Cumulative PnL series
-        cum_pnl = []
-        running = 0.0
-        for t in trades:
-            running += t.pnl
-            cum_pnl.append(running)
-
-        # Linear regression: slope of cum_pnl vs index
-        x = np.arange(len(cum_pnl), dtype=float)
-        y = np.array(cum_pnl, dtype=float)
-
-        # Normalize y to [0, 1] range for comparable slope
-        y_range = y.max() - y.min()
-        if y_range < 1e-10:
-            return 0.0
-
-        y_norm = (y - y.min()) / y_range
-        x_norm = x / len(x)
-
-        # Slope via least squares
-        x_mean = x_norm.mean()
-        y_mean = y_norm.mean()
-        numerator = ((x_norm - x_mean) * (y_norm - y_mean)).sum()
-        denominator = ((x_norm - x_mean) ** 2).sum()
-
-        if denominator < 1e-10:
-            return 0.0
-
-        slope = numerator / denominator
-        # Clamp to [-1, +1]
-        return float(max(-1.0, min(1.0, slope)))
@@ -1,60 +1,104 @@
 import pandas as pd
 import numpy as np
-from ta.momentum import RSIIndicator
-from ta.trend import EMAIndicator, MACD, ADXIndicator
-from ta.volatility import BollingerBands, AverageTrueRange
+from ta.trend import MACD
+from ta.volatility import BollingerBands
+from analysis import indicators_nb
 from config import settings
 
+# Indicator column names (periods are fixed for the life of the process)
+_EMA_FAST_COL = f"ema_{settings.EMA_FAST}"
+_EMA_SLOW_COL = f"ema_{settings.EMA_SLOW}"
+_EMA_TREND_COL = f"ema_{settings.EMA_TREND}"
+_MACD_SUFFIX = f"{settings.MACD_FAST}_{settings.MACD_SLOW}_{settings.MACD_SIGNAL}"
+_MACD_COL = f"MACD_{_MACD_SUFFIX}"
+_MACD_SIGNAL_COL = f"MACDs_{_MACD_SUFFIX}"
+_MACD_HIST_COL = f"MACDh_{_MACD_SUFFIX}"
+_BB_SUFFIX = f"{settings.BB_PERIOD}_{settings.BB_STD}"
+_BB_LOWER_COL = f"BBL_{_BB_SUFFIX}"
+_BB_MID_COL = f"BBM_{_BB_SUFFIX}"
+_BB_UPPER_COL = f"BBU_{_BB_SUFFIX}"
+_ADX_COL = f"ADX_{settings.ADX_PERIOD}"
+_DMP_COL = f"DMP_{settings.ADX_PERIOD}"
+_DMN_COL = f"DMN_{settings.ADX_PERIOD}"
+
+
+def _as_array(series: pd.Series) -> np.ndarray:
+    return series.to_numpy(dtype=np.float64)
+
+
+def _has_columns(df: pd.DataFrame, *cols: str) -> bool:
+    """True if every indicator column is already present (computed earlier)."""
+    return all(col in df.columns for col in cols)
+
 
 def add_ema(df: pd.DataFrame) -> pd.DataFrame:
-    df[f"ema_{settings.EMA_FAST}"] = EMAIndicator(df["close"], window=settings.EMA_FAST).ema_indicator()
-    df[f"ema_{settings.EMA_SLOW}"] = EMAIndicator(df["close"], window=settings.EMA_SLOW).ema_indicator()
-    df[f"ema_{settings.EMA_TREND}"] = EMAIndicator(df["close"], window=settings.EMA_TREND).ema_indicator()
+    if _has_columns(df, _EMA_FAST_COL, _EMA_SLOW_COL, _EMA_TREND_COL):
+        return df
+    fast, slow, trend = indicators_nb.emas3(
+        _as_array(df["close"]), settings.EMA_FAST, settings.EMA_SLOW, settings.EMA_TREND
+    )
+    df[_EMA_FAST_COL] = fast
+    df[_EMA_SLOW_COL] = slow
+    df[_EMA_TREND_COL] = trend
     return df
 
 
 def add_rsi(df: pd.DataFrame) -> pd.DataFrame:
-    df["rsi"] = RSIIndicator(df["close"], window=settings.RSI_PERIOD).rsi()
+    if _has_columns(df, "rsi"):
+        return df
+    df["rsi"] = indicators_nb.rsi(_as_array(df["close"]), settings.RSI_PERIOD)
     return df
 
 
 def add_macd(df: pd.DataFrame) -> pd.DataFrame:
+    if _has_columns(df, _MACD_COL, _MACD_SIGNAL_COL, _MACD_HIST_COL):
+        return df
     macd = MACD(
         df["close"],
         window_fast=settings.MACD_FAST,
         window_slow=settings.MACD_SLOW,
         window_sign=settings.MACD_SIGNAL,
     )
-    df[f"MACD_{settings.MACD_FAST}_{settings.MACD_SLOW}_{settings.MACD_SIGNAL}"] = macd.macd()
-    df[f"MACDs_{settings.MACD_FAST}_{settings.MACD_SLOW}_{settings.MACD_SIGNAL}"] = macd.macd_signal()
-    df[f"MACDh_{settings.MACD_FAST}_{settings.MACD_SLOW}_{settings.MACD_SIGNAL}"] = macd.macd_diff()
+    df[_MACD_COL] = macd.macd()
+    df[_MACD_SIGNAL_COL] = macd.macd_signal()
+    df[_MACD_HIST_COL] = macd.macd_diff()
     return df
 
 
 def add_bollinger_bands(df: pd.DataFrame) -> pd.DataFrame:
+    if _has_columns(df, _BB_LOWER_COL, _BB_MID_COL, _BB_UPPER_COL):
+        return df
     bb = BollingerBands(df["close"], window=settings.BB_PERIOD, window_dev=settings.BB_STD)
-    df[f"BBL_{settings.BB_PERIOD}_{settings.BB_STD}"] = bb.bollinger_lband()
-    df[f"BBM_{settings.BB_PERIOD}_{settings.BB_STD}"] = bb.bollinger_mavg()
-    df[f"BBU_{settings.BB_PERIOD}_{settings.BB_STD}"] = bb.bollinger_hband()
+    df[_BB_LOWER_COL] = bb.bollinger_lband()
+    df[_BB_MID_COL] = bb.bollinger_mavg()
+    df[_BB_UPPER_COL] = bb.bollinger_hband()
     return df
 
 
 def add_atr(df: pd.DataFrame) -> pd.DataFrame:
-    df["atr"] = AverageTrueRange(
-        df["high"], df["low"], df["close"], window=settings.ATR_PERIOD
-    ).average_true_range()
+    if _has_columns(df, "atr"):
+        return df
+    df["atr"] = indicators_nb.atr(
+        _as_array(df["high"]), _as_array(df["low"]), _as_array(df["close"]), settings.ATR_PERIOD
+    )
     return df
 
 
 def add_adx(df: pd.DataFrame) -> pd.DataFrame:
-    adx = ADXIndicator(df["high"], df["low"], df["close"], window=settings.ADX_PERIOD)
-    df[f"ADX_{settings.ADX_PERIOD}"] = adx.adx()
-    df[f"DMP_{settings.ADX_PERIOD}"] = adx.adx_pos()
-    df[f"DMN_{settings.ADX_PERIOD}"] = adx.adx_neg()
+    if _has_columns(df, _ADX_COL, _DMP_COL, _DMN_COL):
+        return df
+    adx, plus_di, minus_di = indicators_nb.adx(
+        _as_array(df["high"]), _as_array(df["low"]), _as_array(df["close"]), settings.ADX_PERIOD
+    )
+    df[_ADX_COL] = adx
+    df[_DMP_COL] = plus_di
+    df[_DMN_COL] = minus_di
     return df
 
 
 def add_volume_sma(df: pd.DataFrame) -> pd.DataFrame:
+    if _has_columns(df, "volume_sma", "volume_ratio"):
+        return df
     df["volume_sma"] = df["volume"].rolling(window=settings.VOLUME_SMA_PERIOD).mean()
     df["volume_ratio"] = df["volume"] / df["volume_sma"]
     return df
@@ -62,10 +106,12 @@ def add_volume_sma(df: pd.DataFrame) -> pd.DataFrame:
 
 def add_obv(df: pd.DataFrame) -> pd.DataFrame:
     """On-Balance Volume — tracks cumulative volume flow."""
+    if _has_columns(df, "obv", "obv_ema"):
+        return df
     direction = np.where(df["close"] > df["close"].shift(1), 1,
                 np.where(df["close"] < df["close"].shift(1), -1, 0))
     df["obv"] = (df["volume"] * direction).cumsum()
-    df["obv_ema"] = EMAIndicator(df["obv"].fillna(0), window=settings.OBV_EMA_PERIOD).ema_indicator()
+    df["obv_ema"] = indicators_nb.ema(_as_array(df["obv"].fillna(0)), settings.OBV_EMA_PERIOD)
     return df
 
 
@@ -114,13 +160,12 @@ def detect_macd_divergence(df: pd.DataFrame, lookback: int | None = None) -> str
     """
     if lookback is None:
         lookback = getattr(settings, "DIVERGENCE_LOOKBACK", 20)
-    hist_col = f"MACDh_{settings.MACD_FAST}_{settings.MACD_SLOW}_{settings.MACD_SIGNAL}"
-    if len(df) < lookback or hist_col not in df.columns:
+    if len(df) < lookback or _MACD_HIST_COL not in df.columns:
         return "none"
 
     recent = df.tail(lookback)
     close = recent["close"].values
-    hist = recent[hist_col].values
+    hist = recent[_MACD_HIST_COL].values
 
     lows_idx = []
     highs_idx = []
@@ -157,12 +202,12 @@ def get_higher_tf_trend(df: pd.DataFrame) -> str:
     df = add_ema(df)
     df = add_adx(df)
 
-    last = df.iloc[-1]
-    ema_fast = last.get(f"ema_{settings.EMA_FAST}", 0)
-    ema_slow = last.get(f"ema_{settings.EMA_SLOW}", 0)
-    ema_trend = last.get(f"ema_{settings.EMA_TREND}", 0)
-    adx = last.get(f"ADX_{settings.ADX_PERIOD}", 0)
-    close = last["close"]
+    # Columns are guaranteed by add_ema/add_adx above
+    ema_fast = df[_EMA_FAST_COL].iat[-1]
+    ema_slow = df[_EMA_SLOW_COL].iat[-1]
+    ema_trend = df[_EMA_TREND_COL].iat[-1]
+    adx = df[_ADX_COL].iat[-1]
+    close = df["close"].iat[-1]
 
     if adx < 15:
         return "neutral"
@@ -175,24 +220,26 @@ def get_higher_tf_trend(df: pd.DataFrame) -> str:
 
 
 def find_support_resistance(
-    df: pd.DataFrame, lookback: int | None = None, num_levels: int = 3
+    high: np.ndarray, low: np.ndarray, lookback: int | None = None, num_levels: int = 3
 ) -> tuple[list[float], list[float]]:
+    """Support/resistance from clustered swing pivots over the last `lookback` bars."""
     if lookback is None:
         lookback = getattr(settings, "SR_LOOKBACK", 50)
-    if len(df) < lookback:
+    if len(high) < lookback:
         return [], []
 
-    recent = df.tail(lookback)
+    # Views of the recent window (no copy)
+    start = len(high) - lookback
+    h = high[start:]
+    low = low[start:]
 
-    highs = []
-    lows = []
-    h = recent["high"].values
-    low = recent["low"].values
-    for i in range(2, len(recent) - 2):
-        if h[i] > h[i - 1] and h[i] > h[i - 2] and h[i] > h[i + 1] and h[i] > h[i + 2]:
-            highs.append(h[i])
-        if low[i] < low[i - 1] and low[i] < low[i - 2] and low[i] < low[i + 1] and low[i] < low[i + 2]:
-            lows.append(low[i])
+    # Swing pivots: bar i beats the two bars on either side (vectorized over i)
+    h_mid = h[2:-2]
+    low_mid = low[2:-2]
+    is_high = (h_mid > h[1:-3]) & (h_mid > h[:-4]) & (h_mid > h[3:-1]) & (h_mid > h[4:])
+    is_low = (low_mid < low[1:-3]) & (low_mid < low[:-4]) & (low_mid < low[3:-1]) & (low_mid < low[4:])
+    highs = h_mid[is_high].tolist()
+    lows = low_mid[is_low].tolist()
 
     resistance = _cluster_levels(highs, num_levels)
     support = _cluster_levels(lows, num_levels)
@@ -202,23 +249,23 @@ def find_support_resistance(
 def _cluster_levels(levels: list[float], n: int) -> list[float]:
     if not levels:
         return []
-    levels = sorted(levels)
-    clustered = []
-    current_cluster = [levels[0]]
-    threshold = np.mean(levels) * 0.005 if levels else 0
+    arr = np.sort(np.asarray(levels, dtype=np.float64))
+    threshold = arr.mean() * 0.005
+
+    # A new cluster starts wherever the gap to the previous level reaches the threshold
+    breaks = np.flatnonzero(np.diff(arr) >= threshold) + 1
+    clustered = [group.mean() for group in np.split(arr, breaks)]
+
+    return clustered[-n:] if len(clustered) > n else clustered
 
-    for i in range(1, len(levels)):
-        if levels[i] - levels[i - 1] < threshold:
-            current_cluster.append(levels[i])
-        else:
-            clustered.append(np.mean(current_cluster))
-            current_cluster = [levels[i]]
-    clustered.append(np.mean(current_cluster))
 
-    return sorted(clustered)[-n:] if len(clustered) > n else clustered
+def add_regime_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """Only the columns MarketAnalyzer.classify reads (ATR + ADX)."""
+    return add_adx(add_atr(df))
 
 
 def add_all_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """Add every indicator column; stages whose columns already exist are skipped."""
     df = add_ema(df)
     df = add_rsi(df)
     df = add_macd(df)
@@ -0,0 +1,183 @@
+"""
+Numba-compiled indicator kernels.
+
+Drop-in replacements for the `ta` classes used by analysis.indicators. Each
+kernel reproduces the `ta` output bar-for-bar (same warm-up NaNs/zeros, same
+smoothing arithmetic) so strategy thresholds behave exactly as before.
+Falls back to plain Python loops when numba is not installed.
+"""
+
+import numpy as np
+
+from utils.jit import njit
+
+
+@njit(cache=True)
+def _ewm(values, alpha, min_periods):
+    """pandas .ewm(alpha=..., adjust=False).mean() on a NaN-free array."""
+    n = len(values)
+    out = np.empty(n)
+    # pandas recomputes alpha from the centre of mass; mirror it for identical rounding
+    com = (1.0 - alpha) / alpha
+    alpha = 1.0 / (1.0 + com)
+    old_wt_factor = 1.0 - alpha
+    weighted = values[0] if n > 0 else 0.0
+    for i in range(n):
+        cur = values[i]
+        if i > 0 and weighted != cur:
+            weighted = (old_wt_factor * weighted + alpha * cur) / (old_wt_factor + alpha)
+        out[i] = weighted if i + 1 >= min_periods else np.nan
+    return out
+
+
+@njit(cache=True)
+def ema(close, period):
+    """EMA with span=period, NaN until `period` bars are available (ta.EMAIndicator)."""
+    return _ewm(close, 2.0 / (period + 1.0), period)
+
+
+@njit(cache=True)
+def _ewm_alpha(span):
+    # Same rounding path as _ewm: span -> alpha -> com -> alpha
+    alpha = 2.0 / (span + 1.0)
+    return 1.0 / (1.0 + (1.0 - alpha) / alpha)
+
+
+@njit(cache=True)
+def emas3(close, fast, slow, trend):
+    """Three EMAs in a single sweep over close; rows are (fast, slow, trend)."""
+    n = len(close)
+    out = np.empty((3, n))
+    if n == 0:
+        return out
+    a_fast, a_slow, a_trend = _ewm_alpha(fast), _ewm_alpha(slow), _ewm_alpha(trend)
+    e_fast = e_slow = e_trend = close[0]
+    for i in range(n):
+        cur = close[i]
+        if i > 0:
+            if e_fast != cur:
+                e_fast = ((1.0 - a_fast) * e_fast + a_fast * cur) / ((1.0 - a_fast) + a_fast)
+            if e_slow != cur:
+                e_slow = ((1.0 - a_slow) * e_slow + a_slow * cur) / ((1.0 - a_slow) + a_slow)
+            if e_trend != cur:
+                e_trend = ((1.0 - a_trend) * e_trend + a_trend * cur) / ((1.0 - a_trend) + a_trend)
+        out[0, i] = e_fast if i + 1 >= fast else np.nan
+        out[1, i] = e_slow if i + 1 >= slow else np.nan
+        out[2, i] = e_trend if i + 1 >= trend else np.nan
+    return out
+
+
+@njit(cache=True)
+def rsi(close, period):
+    """Wilder RSI (ta.RSIIndicator)."""
+    n = len(close)
+    up = np.zeros(n)
+    down = np.zeros(n)
+    for i in range(1, n):
+        diff = close[i] - close[i - 1]
+        if diff > 0:
+            up[i] = diff
+        elif diff < 0:
+            down[i] = -diff
+    ema_up = _ewm(up, 1.0 / period, period)
+    ema_down = _ewm(down, 1.0 / period, period)
+    out = np.empty(n)
+    for i in range(n):
+        if ema_down[i] == 0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + ema_up[i] / ema_down[i])
+    return out
+
+
+@njit(cache=True)
+def _true_range(high, low, close):
+    n = len(close)
+    tr = np.empty(n)
+    if n > 0:
+        tr[0] = high[0] - low[0]
+    for i in range(1, n):
+        tr[i] = max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+    return tr
+
+
+@njit(cache=True)
+def atr(high, low, close, period):
+    """Wilder ATR seeded with the simple mean of the first `period` TRs (ta.AverageTrueRange)."""
+    n = len(close)
+    out = np.zeros(n)
+    if n < period:
+        return out
+    tr = _true_range(high, low, close)
+    seed = 0.0
+    for i in range(period):
+        seed += tr[i]
+    out[period - 1] = seed / period
+    for i in range(period, n):
+        out[i] = (out[i - 1] * (period - 1) + tr[i]) / float(period)
+    return out
+
+
+@njit(cache=True)
+def adx(high, low, close, period):
+    """ADX, +DI and -DI with ta.ADXIndicator's smoothing and output alignment.
+
+    Returns (adx, plus_di, minus_di); bars still warming up are 0.
+    """
+    n = len(close)
+    adx_out = np.zeros(n)
+    dip_out = np.zeros(n)
+    din_out = np.zeros(n)
+    size = n - (period - 1)
+    if size <= period:
+        return adx_out, dip_out, din_out
+
+    # Directional movement per bar (index 0 has no previous bar)
+    dm_range = np.zeros(n)
+    pos = np.zeros(n)
+    neg = np.zeros(n)
+    for i in range(1, n):
+        dm_range[i] = max(high[i], close[i - 1]) - min(low[i], close[i - 1])
+        diff_up = high[i] - high[i - 1]
+        diff_down = low[i - 1] - low[i]
+        if diff_up > diff_down and diff_up > 0:
+            pos[i] = diff_up
+        if diff_down > diff_up and diff_down > 0:
+            neg[i] = diff_down
+
+    # Wilder running sums; like ta, the final slot is left at zero
+    trs = np.zeros(size)
+    dip = np.zeros(size)
+    din = np.zeros(size)
+    for i in range(1, period + 1):
+        trs[0] += dm_range[i]
+        dip[0] += pos[i]
+        din[0] += neg[i]
+    for i in range(1, size - 1):
+        trs[i] = trs[i - 1] - trs[i - 1] / float(period) + dm_range[period + i]
+        dip[i] = dip[i - 1] - dip[i - 1] / float(period) + pos[period + i]
+        din[i] = din[i - 1] - din[i - 1] / float(period) + neg[period + i]
+
+    dx = np.zeros(size)
+    for i in range(size):
+        if trs[i] != 0:
+            di_plus = 100 * (dip[i] / trs[i])
+            di_minus = 100 * (din[i] / trs[i])
+        else:
+            di_plus = 0.0
+            di_minus = 0.0
+        if di_plus + di_minus != 0:
+            dx[i] = 100 * abs((di_plus - di_minus) / (di_plus + di_minus))
+        if 1 <= i < size - 1:
+            dip_out[i + period] = di_plus
+            din_out[i + period] = di_minus
+
+    seed = 0.0
+    for i in range(period):
+        seed += dx[i]
+    smoothed = seed / period
+    adx_out[2 * period - 1] = smoothed
+    for i in range(period + 1, size):
+        smoothed = (smoothed * (period - 1) + dx[i - 1]) / float(period)
+        adx_out[i + period - 1] = smoothed
+    return adx_out, dip_out, din_out
@@ -2,12 +2,16 @@ from enum import Enum
 
 import pandas as pd
 
-from analysis.indicators import add_all_indicators
+from analysis.indicators import add_ema, add_regime_indicators
 from config import settings
 from utils.logger import setup_logger
 
 logger = setup_logger("market_analyzer")
 
+_ADX_COL = f"ADX_{settings.ADX_PERIOD}"
+_EMA_FAST_COL = f"ema_{settings.EMA_FAST}"
+_EMA_SLOW_COL = f"ema_{settings.EMA_SLOW}"
+
 
 class MarketRegime(Enum):
     TRENDING = "trending"
@@ -20,18 +24,16 @@ class MarketRegime(Enum):
 
 class MarketAnalyzer:
     def classify(self, df: pd.DataFrame, derivatives_data: dict | None = None) -> MarketRegime:
-        df = add_all_indicators(df)
+        df = add_regime_indicators(df)
 
         if len(df) < settings.ATR_PERIOD + settings.ADX_PERIOD:
             logger.warning("Not enough data for regime classification, defaulting to RANGING")
             return MarketRegime.RANGING
 
-        latest = df.iloc[-1]
-
-        adx_col = f"ADX_{settings.ADX_PERIOD}"
-        adx = latest.get(adx_col, 0)
-        atr = latest.get("atr", 0)
-        atr_sma = df["atr"].rolling(settings.VOLUME_SMA_PERIOD).mean().iloc[-1]
+        adx = df[_ADX_COL].iat[-1]
+        atr_arr = df["atr"].to_numpy()
+        atr = atr_arr[-1]
+        atr_sma = atr_arr[-settings.VOLUME_SMA_PERIOD:].mean()
 
         # Check for SQUEEZE_RISK first: elevated ATR + high squeeze_risk from OI data
         if derivatives_data and atr_sma > 0:
@@ -71,13 +73,8 @@ class MarketAnalyzer:
         return MarketRegime.RANGING
 
     def get_trend_direction(self, df: pd.DataFrame) -> str:
-        ema_fast = f"ema_{settings.EMA_FAST}"
-        ema_slow = f"ema_{settings.EMA_SLOW}"
-
-        if ema_fast not in df.columns:
-            df = add_all_indicators(df)
+        df = add_ema(df)
 
-        latest = df.iloc[-1]
-        if latest.get(ema_fast, 0) > latest.get(ema_slow, 0):
+        if df[_EMA_FAST_COL].iat[-1] > df[_EMA_SLOW_COL].iat[-1]:
             return "bullish"
         return "bearish"
@@ -0,0 +1,208 @@
+"""
+Compiled kernels for the backtest bar loop and the report metrics.
+
+numba caches each compiled signature on disk (cache=True), so only the first
+run on a machine pays the JIT cost. Running this module compiles every kernel
+the backtest and the indicator pipeline use, with the argument types they are
+called with, so a fresh checkout or deploy starts warm:
+
+    python -m backtest._kernels
+
+The process-pool runners call warm_up() before creating their pool, so forked
+workers inherit the compiled dispatchers instead of each loading or compiling
+them on first use.
+"""
+
+import numpy as np
+
+from utils.jit import HAVE_NUMBA, njit
+
+
+@njit(cache=True)
+def exit_hits_nb(highs, lows, present, is_buy, stops, targets):
+    """
+    Per open position: (stop hit, target hit) on this bar's high/low. The stop
+    is checked first (worst case), so a bar touching both counts as a stop.
+    """
+    n = len(highs)
+    hit_sl = np.zeros(n, dtype=np.bool_)
+    hit_tp = np.zeros(n, dtype=np.bool_)
+    for k in range(n):
+        if not present[k]:
+            continue
+        if is_buy[k]:
+            if lows[k] <= stops[k]:
+                hit_sl[k] = True
+            elif highs[k] >= targets[k]:
+                hit_tp[k] = True
+        else:
+            if highs[k] >= stops[k]:
+                hit_sl[k] = True
+            elif lows[k] <= targets[k]:
+                hit_tp[k] = True
+    return hit_sl, hit_tp
+
+
+if not HAVE_NUMBA:
+    # Without numba the loop above runs as plain Python; whole-array compares
+    # give the same masks in C
+    def exit_hits_nb(highs, lows, present, is_buy, stops, targets):  # noqa: F811
+        """Array-at-a-time exit_hits_nb (same results)."""
+        hit_sl = present & np.where(is_buy, lows <= stops, highs >= stops)
+        hit_tp = present & ~hit_sl & np.where(is_buy, highs >= targets, lows <= targets)
+        return hit_sl, hit_tp
+
+
+@njit(cache=True)
+def trail_stops_nb(is_buy, entry, stops, highest, lowest, activated, initial_risk,
+                    trail_distance, highs, lows, breakeven_rr):
+    """
+    Ratchet trailing stops on this bar's high/low, in place. Trailing activates
+    (stop to breakeven) once the best price is breakeven_rr x risk in profit.
+    """
+    for k in range(len(stops)):
+        if is_buy[k]:
+            if highs[k] > highest[k]:
+                highest[k] = highs[k]
+            if not activated[k] and highest[k] - entry[k] >= breakeven_rr * initial_risk[k]:
+                activated[k] = True
+                stops[k] = max(stops[k], entry[k])
+            if activated[k]:
+                new_stop = highest[k] - trail_distance[k]
+                if new_stop > stops[k]:
+                    stops[k] = new_stop
+        else:
+            if lows[k] < lowest[k]:
+                lowest[k] = lows[k]
+            if not activated[k] and entry[k] - lowest[k] >= breakeven_rr * initial_risk[k]:
+                activated[k] = True
+                stops[k] = min(stops[k], entry[k])
+            if activated[k]:
+                new_stop = lowest[k] + trail_distance[k]
+                if new_stop < stops[k]:
+                    stops[k] = new_stop
+
+
+@njit(cache=True)
+def drawdown_kernel(equity):
+    """
+    (max drawdown fraction, longest drawdown in bars) in one pass. A drawdown
+    period runs from a peak to the next new peak (or the end of the curve) and
+    only counts once some drawdown has been seen.
+    """
+    n = len(equity)
+    if n == 0:
+        return 0.0, 0
+    peak = equity[0]
+    max_dd = 0.0
+    max_duration = 0
+    start = 0
+    for i in range(n):
+        eq = equity[i]
+        if eq > peak:
+            if i - start > max_duration and max_dd > 0:
+                max_duration = i - start
+            peak = eq
+            start = i
+        else:
+            dd = (peak - eq) / peak
+            if dd > max_dd:
+                max_dd = dd
+    if n - start > max_duration and max_dd > 0:
+        max_duration = n - start
+    if max_dd <= 0:
+        return 0.0, 0
+    return max_dd, max_duration
+
+
+@njit(cache=True)
+def streaks_kernel(pnl):
+    """(longest run of winning trades, longest run of non-winning trades)."""
+    max_wins = max_losses = wins = losses = 0
+    for k in range(len(pnl)):
+        if pnl[k] > 0:
+            wins += 1
+            losses = 0
+            if wins > max_wins:
+                max_wins = wins
+        else:
+            losses += 1
+            wins = 0
+            if losses > max_losses:
+                max_losses = losses
+    return max_wins, max_losses
+
+
+if not HAVE_NUMBA:
+    # Interpreted, the loops above cost a Python step per bar/trade; the same
+    # results from whole-array NumPy passes
+    def drawdown_kernel(equity):  # noqa: F811
+        """NumPy drawdown_kernel (same results)."""
+        if len(equity) == 0:
+            return 0.0, 0
+        peaks = np.maximum.accumulate(equity)
+        # Drawdowns computed into one scratch buffer rather than two temporaries
+        dd = np.subtract(peaks, equity)
+        np.divide(dd, peaks, out=dd)
+        max_dd = float(dd.max())
+        if max_dd <= 0:
+            return 0.0, 0
+        new_peaks = np.flatnonzero(equity[1:] > peaks[:-1]) + 1
+        starts = np.concatenate(([0], new_peaks))
+        ends = np.append(new_peaks, len(equity))
+        first_dd = int(np.argmax(peaks > equity))
+        counted = np.append(new_peaks > first_dd, True)
+        return max_dd, int((ends - starts)[counted].max())
+
+    def streaks_kernel(pnl):  # noqa: F811
+        """NumPy streaks_kernel (same results)."""
+        wins = pnl > 0
+
+        def longest(mask):
+            edges = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False])).astype(np.int8)))
+            runs = edges[1::2] - edges[::2]
+            return int(runs.max()) if runs.size else 0
+
+        return longest(wins), longest(~wins)
+
+
+def warm_up():
+    """Compile (or load from cache) every kernel for the dtypes the engine passes."""
+    from adaptive.performance_tracker import _trend_weights, _window_shape_nb
+    from analysis import indicators_nb
+
+    # Indicator inputs come from Series.to_numpy(): read-only views under pandas
+    # copy-on-write, writable arrays otherwise. Each is its own signature
+    for writeable in (True, False):
+        close = np.linspace(100.0, 110.0, 64)
+        high, low = close + 1.0, close - 1.0
+        for arr in (close, high, low):
+            arr.flags.writeable = writeable
+        indicators_nb.emas3(close, 9, 21, 50)
+        indicators_nb.ema(close, 9)
+        indicators_nb.rsi(close, 14)
+        indicators_nb.atr(high, low, close, 14)
+        indicators_nb.adx(high, low, close, 14)
+
+    # Exit/trailing kernels: float64 bar prices and position state
+    k = 2
+    flags = np.array([True, False])
+    prices = np.full(k, 100.0)
+    exit_hits_nb(prices, prices, flags, flags, prices, prices)
+    trail_stops_nb(flags, prices, prices.copy(), prices.copy(), prices.copy(), flags.copy(),
+                    prices, prices, prices, prices, 1.5)
+
+    # Report metrics: equity from the equity-curve frame, PnL from the trade buffer
+    equity = np.array([100.0, 99.0, 101.0])
+    drawdown_kernel(equity)
+    equity.flags.writeable = False
+    drawdown_kernel(equity)
+    streaks_kernel(np.array([1.0, -1.0]))
+
+    # Adaptive tracker: ring-buffer PnL window, read-only cached trend weights
+    _window_shape_nb(np.array([1.0, -1.0, 0.5]), _trend_weights(3))
+
+
+if __name__ == "__main__":
+    warm_up()
+    print("numba kernels compiled and cached")
@@ -1,18 +1,41 @@
-"""Historical OHLCV data downloader with CSV caching."""
+"""Historical OHLCV data downloader with Parquet (or CSV) caching."""
 
+import asyncio
 import os
-import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 
 import ccxt
+import ccxt.async_support as ccxt_async
+import numpy as np
 import pandas as pd
 
 from utils.logger import setup_logger
 
 logger = setup_logger("data_loader")
 
+try:
+    import pyarrow  # noqa: F401 — Parquet engine
+    CACHE_FORMAT = "parquet"
+except ImportError:  # pragma: no cover - fall back to text cache
+    CACHE_FORMAT = "csv"
+
+try:
+    import ciso8601  # C ISO-8601 parser
+except ImportError:  # pragma: no cover - stdlib strptime fallback
+    ciso8601 = None
+
 CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "historical")
 
+# Legacy CSV cache layout. to_csv writes ISO timestamps, date-only when every
+# bar is at midnight (1d), so parse as ISO-8601 rather than one fixed format
+_CSV_DATE_FORMAT = "ISO8601"
+_CSV_DTYPES = {col: "float64" for col in ("open", "high", "low", "close", "volume")}
+
+# Candles per fetch_ohlcv page (Binance futures klines max)
+_BATCH_LIMIT = 1500
+
 # Milliseconds per candle for each timeframe
 TIMEFRAME_MS = {
     "1m": 60_000,
@@ -23,43 +46,137 @@ TIMEFRAME_MS = {
     "1d": 86_400_000,
 }
 
+_EXCHANGE_CONFIG = {
+    "enableRateLimit": True,
+    "options": {"defaultType": "future"},
+}
+
+
+@lru_cache(maxsize=None)
+def to_epoch_ms(date: str | int) -> int:
+    """"YYYY-MM-DD" (UTC) -> epoch milliseconds; ints are taken as epoch ms already."""
+    if isinstance(date, int):
+        return date
+    if ciso8601 is not None:
+        dt = ciso8601.parse_datetime(date)
+    else:
+        dt = datetime.strptime(date, "%Y-%m-%d")
+    return int(dt.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class _CandleBuffer:
+    """ccxt OHLCV pages appended straight into an (n, 6) float64 array, pre-sized from the range."""
+
+    def __init__(self, start_ms: int, end_ms: int, tf_ms: int):
+        self._rows = np.empty((max(0, (end_ms - start_ms) // tf_ms) + 100, 6))
+        self._size = 0
+
+    def extend(self, candles: list):
+        end = self._size + len(candles)
+        if end > len(self._rows):
+            # The last page can run past the estimate (it isn't clipped to end_ms)
+            grown = np.empty((max(end, 2 * len(self._rows)), 6))
+            grown[:self._size] = self._rows[:self._size]
+            self._rows = grown
+        self._rows[self._size:end] = candles
+        self._size = end
+
+    def values(self) -> np.ndarray:
+        return self._rows[:self._size]
+
+
+@dataclass
+class FetchRequest:
+    """One (symbol, timeframe) series for DataLoader.load_many()."""
+    symbol: str
+    timeframe: str
+    start_date: str | int  # "YYYY-MM-DD" or epoch ms
+    end_date: str | int
+    gap_fill: bool = False  # True: download() semantics, False: load() (cache preferred)
+
 
 class DataLoader:
     """Download and cache historical OHLCV data from Binance public API."""
 
-    def __init__(self):
-        self.exchange = ccxt.binance({
-            "enableRateLimit": True,
-            "options": {"defaultType": "future"},
-        })
-
-    def _cache_path(self, symbol: str, timeframe: str) -> str:
-        """Generate cache file path: data/historical/XRP_USDT_15m.csv"""
+    def __init__(self, mmap: bool = False):
+        """
+        Args:
+            mmap: Keep the cache as uncompressed Arrow IPC files and memory-map
+                them on load, so repeated runs/processes share the OS page
+                cache instead of each decoding their own copy. Needs pyarrow.
+        """
+        self.exchange = ccxt.binance(dict(_EXCHANGE_CONFIG))
+        self.cache_format = CACHE_FORMAT
+        if mmap:
+            if CACHE_FORMAT == "parquet":
+                self.cache_format = "arrow"
+            else:
+                logger.warning("pyarrow not installed — memory-mapped cache disabled")
+
+    def _cache_path(self, symbol: str, timeframe: str, fmt: str | None = None) -> str:
+        """Generate cache file path: data/historical/XRP_USDT_15m.parquet"""
         safe_symbol = symbol.replace("/", "_")
-        return os.path.join(CACHE_DIR, f"{safe_symbol}_{timeframe}.csv")
+        return os.path.join(CACHE_DIR, f"{safe_symbol}_{timeframe}.{fmt or self.cache_format}")
+
+    @staticmethod
+    def _read_cache(path: str, fmt: str) -> pd.DataFrame:
+        if fmt == "arrow":
+            import pyarrow as pa
+            # Columns stay views into the mapped file (read-only, zero-copy)
+            with pa.memory_map(path, "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+            return table.to_pandas(split_blocks=True, zero_copy_only=True)
+        if fmt == "parquet":
+            # Parquet keeps the DatetimeIndex and float64 dtypes
+            return pd.read_parquet(path, engine="pyarrow")
+        # Explicit date format and dtypes skip pandas' per-value inference
+        return pd.read_csv(
+            path, index_col="timestamp", parse_dates=["timestamp"],
+            date_format=_CSV_DATE_FORMAT, dtype=_CSV_DTYPES,
+        )
 
-    def _load_cached(self, symbol: str, timeframe: str) -> pd.DataFrame:
-        """Load cached CSV if it exists."""
+    def load_cached(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """Cached candles for symbol/timeframe (empty if none), migrating an older-format cache once.
+
+        Offline tools should read the cache through this rather than the files,
+        whose format depends on the installed engine (Parquet, else CSV).
+        """
         path = self._cache_path(symbol, timeframe)
-        if not os.path.exists(path):
-            return pd.DataFrame()
-        df = pd.read_csv(path, parse_dates=["timestamp"], index_col="timestamp")
-        df = df.astype(float)
-        return df
+        if os.path.exists(path):
+            return self._read_cache(path, self.cache_format)
+
+        for fmt in ("parquet", "csv"):
+            old_path = self._cache_path(symbol, timeframe, fmt)
+            if fmt == self.cache_format or not os.path.exists(old_path):
+                continue
+            # The old file is left in place; it is no longer updated
+            self._save_cache(self._read_cache(old_path, fmt), symbol, timeframe)
+            return self._read_cache(path, self.cache_format)
+        return pd.DataFrame()
 
     def _save_cache(self, df: pd.DataFrame, symbol: str, timeframe: str):
-        """Save DataFrame to CSV cache."""
+        """Save DataFrame to the cache."""
         os.makedirs(CACHE_DIR, exist_ok=True)
         path = self._cache_path(symbol, timeframe)
-        df.to_csv(path)
+        # Write beside the target and rename into place, so another process
+        # (parallel walk-forward windows) never reads a half-written file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if self.cache_format == "arrow":
+            import pyarrow.feather as feather
+            feather.write_feather(df, tmp_path, compression="uncompressed")
+        elif self.cache_format == "parquet":
+            df.to_parquet(tmp_path, engine="pyarrow", compression="zstd")
+        else:
+            df.to_csv(tmp_path)
+        os.replace(tmp_path, path)
         logger.info(f"Cached {len(df)} candles to {path}")
 
     def download(
         self,
         symbol: str,
         timeframe: str,
-        start_date: str,
-        end_date: str,
+        start_date: str | int,
+        end_date: str | int,
     ) -> pd.DataFrame:
         """
         Download OHLCV data from Binance, merging with any cached data.
@@ -67,62 +184,81 @@ class DataLoader:
         Args:
             symbol: Trading pair (e.g., "XRP/USDT")
             timeframe: Candle timeframe (e.g., "15m", "1h", "4h")
-            start_date: Start date string "YYYY-MM-DD"
-            end_date: End date string "YYYY-MM-DD"
+            start_date: Start date string "YYYY-MM-DD" (or epoch ms)
+            end_date: End date string "YYYY-MM-DD" (or epoch ms)
 
         Returns:
             DataFrame with columns [open, high, low, close, volume] and
             DatetimeIndex named 'timestamp'.
         """
-        start_ms = int(datetime.strptime(start_date, "%Y-%m-%d").replace(
-            tzinfo=timezone.utc).timestamp() * 1000)
-        end_ms = int(datetime.strptime(end_date, "%Y-%m-%d").replace(
-            tzinfo=timezone.utc).timestamp() * 1000)
+        start_ms, end_ms = to_epoch_ms(start_date), to_epoch_ms(end_date)
         tf_ms = TIMEFRAME_MS.get(timeframe, 900_000)
 
-        # Load existing cache to find gaps
-        cached = self._load_cached(symbol, timeframe)
-        if not cached.empty:
-            cached_start_ms = int(cached.index[0].timestamp() * 1000)
-            cached_end_ms = int(cached.index[-1].timestamp() * 1000)
-
-            # Only download what's missing
-            ranges_to_fetch = []
-            if start_ms < cached_start_ms:
-                ranges_to_fetch.append((start_ms, cached_start_ms - tf_ms))
-            if end_ms > cached_end_ms:
-                ranges_to_fetch.append((cached_end_ms + tf_ms, end_ms))
-
-            if not ranges_to_fetch:
-                logger.info(f"Cache hit for {symbol} {timeframe} — no download needed")
-                return self._filter_range(cached, start_ms, end_ms)
-
-            # Download missing ranges
-            new_frames = [cached]
-            for fetch_start, fetch_end in ranges_to_fetch:
-                df_part = self._fetch_range(symbol, timeframe, fetch_start, fetch_end, tf_ms)
-                if not df_part.empty:
-                    new_frames.append(df_part)
-
-            combined = pd.concat(new_frames)
-            combined = combined[~combined.index.duplicated(keep="last")]
-            combined.sort_index(inplace=True)
+        cached = self.load_cached(symbol, timeframe)
+        gaps = self._missing_ranges(cached, start_ms, end_ms, tf_ms)
+        if not gaps:
+            logger.info(f"Cache hit for {symbol} {timeframe} — no download needed")
+            return self.filter_range(cached, start_ms, end_ms)
+
+        fetched = {
+            side: self._fetch_range(symbol, timeframe, lo, hi, tf_ms)
+            for side, (lo, hi) in gaps.items()
+        }
+        return self._merge_fetched(cached, fetched, symbol, timeframe, start_ms, end_ms)
+
+    @staticmethod
+    def _missing_ranges(
+        cached: pd.DataFrame, start_ms: int, end_ms: int, tf_ms: int
+    ) -> dict[str, tuple[int, int]]:
+        """Ranges to fetch, keyed "before"/"after" the cached span (empty on a full hit)."""
+        if cached.empty:
+            # No cache — download everything
+            return {"after": (start_ms, end_ms)}
+
+        cached_start_ms = int(cached.index[0].timestamp() * 1000)
+        cached_end_ms = int(cached.index[-1].timestamp() * 1000)
+
+        # Only download what's missing: a gap before and/or after the cache
+        gaps = {}
+        if start_ms < cached_start_ms:
+            gaps["before"] = (start_ms, cached_start_ms - tf_ms)
+        if end_ms > cached_end_ms:
+            gaps["after"] = (cached_end_ms + tf_ms, end_ms)
+        return gaps
+
+    def _merge_fetched(
+        self,
+        cached: pd.DataFrame,
+        fetched: dict[str, pd.DataFrame],
+        symbol: str,
+        timeframe: str,
+        start_ms: int,
+        end_ms: int,
+    ) -> pd.DataFrame:
+        """Stitch fetched gaps onto the cache, persist if anything was added, and filter."""
+        # Fetched parts lie strictly outside the cached span, so stitching them
+        # on either side keeps the index sorted and unique — only the (small)
+        # new parts need cleaning, not the whole history
+        frames = [
+            self._sorted_unique(fetched.get("before")),
+            cached,
+            self._sorted_unique(fetched.get("after")),
+        ]
+        frames = [f for f in frames if f is not None and not f.empty]
+        if not frames:
+            return pd.DataFrame()
+        combined = pd.concat(frames) if len(frames) > 1 else frames[0]
+        if len(combined) > len(cached):
             self._save_cache(combined, symbol, timeframe)
-            return self._filter_range(combined, start_ms, end_ms)
-
-        # No cache — download everything
-        df = self._fetch_range(symbol, timeframe, start_ms, end_ms, tf_ms)
-        if not df.empty:
-            self._save_cache(df, symbol, timeframe)
-        return df
+        return self.filter_range(combined, start_ms, end_ms)
 
     def _fetch_range(
         self, symbol: str, timeframe: str, start_ms: int, end_ms: int, tf_ms: int
     ) -> pd.DataFrame:
         """Paginate through Binance API to fetch a date range."""
-        all_candles = []
+        candles_buf = _CandleBuffer(start_ms, end_ms, tf_ms)
         since = start_ms
-        batch_limit = 1000
+        batch_limit = _BATCH_LIMIT
 
         logger.info(
             f"Downloading {symbol} {timeframe} from "
@@ -142,68 +278,178 @@ class DataLoader:
             if not candles:
                 break
 
-            all_candles.extend(candles)
+            candles_buf.extend(candles)
             last_ts = candles[-1][0]
 
             # If we got fewer than limit, we've reached the end
             if len(candles) < batch_limit:
                 break
 
+            # No sleep here: enableRateLimit already paces fetch_ohlcv
             since = last_ts + tf_ms
-            # Be polite to the API
-            time.sleep(self.exchange.rateLimit / 1000)
 
-        if not all_candles:
+        return self._candles_to_frame(candles_buf.values(), symbol, timeframe, start_ms, end_ms)
+
+    async def _fetch_range_async(
+        self,
+        exchange: ccxt_async.Exchange,
+        symbol: str,
+        timeframe: str,
+        start_ms: int,
+        end_ms: int,
+        tf_ms: int,
+    ) -> pd.DataFrame:
+        """Async _fetch_range; the shared exchange's rate limiter paces the requests."""
+        candles_buf = _CandleBuffer(start_ms, end_ms, tf_ms)
+        since = start_ms
+        batch_limit = _BATCH_LIMIT
+
+        logger.info(
+            f"Downloading {symbol} {timeframe} from "
+            f"{datetime.fromtimestamp(start_ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d')} to "
+            f"{datetime.fromtimestamp(end_ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d')}..."
+        )
+
+        while since < end_ms:
+            try:
+                candles = await exchange.fetch_ohlcv(
+                    symbol, timeframe, since=since, limit=batch_limit
+                )
+            except Exception as e:
+                logger.error(f"Error fetching {symbol} {timeframe} at {since}: {e}")
+                break
+
+            if not candles:
+                break
+
+            candles_buf.extend(candles)
+            if len(candles) < batch_limit:
+                break
+            since = candles[-1][0] + tf_ms
+
+        return self._candles_to_frame(candles_buf.values(), symbol, timeframe, start_ms, end_ms)
+
+    def _candles_to_frame(
+        self, candles: np.ndarray, symbol: str, timeframe: str, start_ms: int, end_ms: int
+    ) -> pd.DataFrame:
+        """(n, 6) OHLCV rows -> float DataFrame indexed by timestamp, clipped to range."""
+        if not len(candles):
             logger.warning(f"No data returned for {symbol} {timeframe}")
             return pd.DataFrame()
 
-        df = pd.DataFrame(
-            all_candles, columns=["timestamp", "open", "high", "low", "close", "volume"]
+        index = pd.DatetimeIndex(
+            pd.to_datetime(candles[:, 0].astype(np.int64), unit="ms"), name="timestamp"
         )
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-        df.set_index("timestamp", inplace=True)
-        df = df.astype(float)
+        df = pd.DataFrame(candles[:, 1:], index=index, columns=["open", "high", "low", "close", "volume"])
         # Filter to requested range
-        df = self._filter_range(df, start_ms, end_ms)
+        df = self.filter_range(df, start_ms, end_ms)
         logger.info(f"Downloaded {len(df)} candles for {symbol} {timeframe}")
         return df
 
-    def _filter_range(self, df: pd.DataFrame, start_ms: int, end_ms: int) -> pd.DataFrame:
+    @staticmethod
+    def _sorted_unique(df: pd.DataFrame | None) -> pd.DataFrame | None:
+        """Sort a freshly fetched frame and drop duplicate candles (last one wins)."""
+        if df is None or df.empty:
+            return df
+        if not df.index.is_unique:
+            df = df[~df.index.duplicated(keep="last")]
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        return df
+
+    def filter_range(self, df: pd.DataFrame, start_ms: int, end_ms: int) -> pd.DataFrame:
         """Filter DataFrame to the requested date range."""
         start_dt = pd.Timestamp(start_ms, unit="ms")
         end_dt = pd.Timestamp(end_ms, unit="ms")
-        return df[(df.index >= start_dt) & (df.index <= end_dt)]
+        if not df.index.is_monotonic_increasing:
+            return df[(df.index >= start_dt) & (df.index <= end_dt)]
+        # Sorted index: a positional slice is a view (keeps mmap'd data zero-copy)
+        lo = df.index.searchsorted(start_dt, side="left")
+        hi = df.index.searchsorted(end_dt, side="right")
+        return df.iloc[lo:hi]
 
     def load(
         self,
         symbol: str,
         timeframe: str,
-        start_date: str,
-        end_date: str,
+        start_date: str | int,
+        end_date: str | int,
     ) -> pd.DataFrame:
         """
         Load data from cache, downloading if not available.
 
         Same interface as download() but prefers cache.
         """
-        cached = self._load_cached(symbol, timeframe)
+        cached = self.load_cached(symbol, timeframe)
         if not cached.empty:
-            start_ms = int(datetime.strptime(start_date, "%Y-%m-%d").replace(
-                tzinfo=timezone.utc).timestamp() * 1000)
-            end_ms = int(datetime.strptime(end_date, "%Y-%m-%d").replace(
-                tzinfo=timezone.utc).timestamp() * 1000)
-            filtered = self._filter_range(cached, start_ms, end_ms)
+            filtered = self.filter_range(cached, to_epoch_ms(start_date), to_epoch_ms(end_date))
             if not filtered.empty:
                 return filtered
 
         # Fall back to download
         return self.download(symbol, timeframe, start_date, end_date)
 
+    async def _download_async(
+        self, exchange: ccxt_async.Exchange, symbol: str, timeframe: str,
+        start_date: str | int, end_date: str | int,
+    ) -> pd.DataFrame:
+        """Async download(): the before/after gaps are fetched concurrently."""
+        start_ms, end_ms = to_epoch_ms(start_date), to_epoch_ms(end_date)
+        tf_ms = TIMEFRAME_MS.get(timeframe, 900_000)
+
+        cached = self.load_cached(symbol, timeframe)
+        gaps = self._missing_ranges(cached, start_ms, end_ms, tf_ms)
+        if not gaps:
+            logger.info(f"Cache hit for {symbol} {timeframe} — no download needed")
+            return self.filter_range(cached, start_ms, end_ms)
+
+        frames = await asyncio.gather(*(
+            self._fetch_range_async(exchange, symbol, timeframe, lo, hi, tf_ms)
+            for lo, hi in gaps.values()
+        ))
+        fetched = dict(zip(gaps, frames))
+        return self._merge_fetched(cached, fetched, symbol, timeframe, start_ms, end_ms)
+
+    async def _load_async(
+        self, exchange: ccxt_async.Exchange, symbol: str, timeframe: str,
+        start_date: str | int, end_date: str | int,
+    ) -> pd.DataFrame:
+        """Async load(): cache first, falling back to _download_async."""
+        cached = self.load_cached(symbol, timeframe)
+        if not cached.empty:
+            filtered = self.filter_range(cached, to_epoch_ms(start_date), to_epoch_ms(end_date))
+            if not filtered.empty:
+                return filtered
+        return await self._download_async(exchange, symbol, timeframe, start_date, end_date)
+
+    async def _load_many_async(self, requests: list[FetchRequest]) -> list[pd.DataFrame]:
+        # One async exchange shared by every task so its rate limiter sees all requests
+        exchange = ccxt_async.binance(dict(_EXCHANGE_CONFIG))
+        try:
+            return await asyncio.gather(*(
+                (self._download_async if req.gap_fill else self._load_async)(
+                    exchange, req.symbol, req.timeframe, req.start_date, req.end_date
+                )
+                for req in requests
+            ))
+        finally:
+            await exchange.close()
+
+    def load_many(self, requests: list[FetchRequest]) -> list[pd.DataFrame]:
+        """
+        Load several series concurrently (cache misses are downloaded in parallel).
+
+        Returns one DataFrame per request, in request order.
+        """
+        if not requests:
+            return []
+        return asyncio.run(self._load_many_async(requests))
+
     def load_multi_timeframe(
         self,
         symbol: str,
-        start_date: str,
-        end_date: str,
+        start_date: str | int,
+        end_date: str | int,
         timeframes: list[str] | None = None,
     ) -> dict[str, pd.DataFrame]:
         """
@@ -216,9 +462,7 @@ class DataLoader:
             from config import settings
             timeframes = settings.TIMEFRAMES
 
-        result = {}
-        for tf in timeframes:
-            df = self.load(symbol, tf, start_date, end_date)
-            if not df.empty:
-                result[tf] = df
-        return result
+        frames = self.load_many(
+            [FetchRequest(symbol, tf, start_date, end_date) for tf in timeframes]
+        )
+        return {tf: df for tf, df in zip(timeframes, frames) if not df.empty}
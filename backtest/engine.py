@@ -1,18 +1,29 @@
 """Core backtesting engine — bar-by-bar simulation mirroring bot.py._tick()."""
 
-from dataclasses import dataclass, field
+import logging
+import multiprocessing as mp
+import os
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timezone
+from functools import reduce
+from typing import NamedTuple
 
+import numpy as np
 import pandas as pd
 
 from analysis.indicators import add_all_indicators
-from backtest.data_loader import DataLoader
+from backtest._kernels import exit_hits_nb, trail_stops_nb
+from backtest.data_loader import DataLoader, FetchRequest, to_epoch_ms
 from config import settings
 from core.portfolio import Portfolio, Position
+from data.pair_scanner import DIRECTIONAL_LOOKBACK
 from risk.risk_manager import RiskManager
 from strategies.base import Signal
 from strategies.strategy_manager import StrategyManager
 from utils.logger import setup_logger
+from utils.pool import FORK_CONTEXT
 
 logger = setup_logger("backtest_engine")
 
@@ -27,6 +38,91 @@ STOP_SLIPPAGE_RATE = 0.0012   # 0.12% on stop-market fills — they slip more in
 FUNDING_RATE_PER_8H = 0.00015 # 0.015%/8h on notional — empirical avg from live funding bleed
 
 
+_MS_PER_DAY = 86_400_000
+_NS_PER_DAY = _MS_PER_DAY * 1_000_000
+
+# Primary-TF price columns kept as aligned (bars x symbols) float64 arrays for the
+# bar loop. Full precision matters: stops often sit exactly on a traded price
+# (breakeven at entry, tick-discrete levels) and must register an exact touch
+_BAR_FIELDS = ("high", "low", "close")
+
+
+def _scan_columns() -> tuple[str, ...]:
+    """Indicator columns PairScanner.score_values takes, in argument order (plus close)."""
+    return (f"ADX_{settings.ADX_PERIOD}", "volume_ratio", f"ema_{settings.EMA_FAST}",
+            f"ema_{settings.EMA_SLOW}", "atr", "close")
+
+
+class _ExitLayout(NamedTuple):
+    """Open positions in portfolio order with their symbol columns and sides."""
+    version: int
+    positions: list
+    cols: np.ndarray
+    known: np.ndarray
+    is_buy: np.ndarray
+
+
+class _StrategyOverrides(NamedTuple):
+    """One strategy's adaptive overrides, resolved against the settings defaults."""
+    enabled: bool
+    min_confidence: float
+    rr_ratio: float
+    sl_atr_multiplier: float
+    size_scale: float
+
+
+class _Bar(NamedTuple):
+    """One symbol's primary-TF candle at the current bar."""
+    high: float
+    low: float
+    close: float
+
+
+def data_requests(symbols: list[str], start_ms: int, end_ms: int) -> list[FetchRequest]:
+    """Every symbol x timeframe series a backtest over [start_ms, end_ms] loads."""
+    # Daily data needs extra lookback for EMA50 computation
+    ema_slow = getattr(settings, "DAILY_EMA_SLOW", 50)
+    lookback_days = ema_slow + 30  # Extra buffer
+    extended_start = start_ms - lookback_days * _MS_PER_DAY
+
+    # Daily uses download() semantics (not load()) to ensure full date coverage with gap-filling
+    return [
+        FetchRequest(symbol, tf, extended_start, end_ms, gap_fill=True)
+        if tf == "1d" else
+        FetchRequest(symbol, tf, start_ms, end_ms)
+        for symbol in symbols
+        for tf in settings.TIMEFRAMES
+    ]
+
+
+def _with_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    add_all_indicators, then consolidated to one block per dtype. Each indicator
+    column lands in its own block, and every .tail()/.copy() of an indicator
+    window would otherwise re-consolidate those ~30 blocks per call.
+    """
+    return add_all_indicators(df).copy()
+
+
+def _equity_frame(index, equity, positions) -> pd.DataFrame:
+    return pd.DataFrame(
+        {"equity": np.asarray(equity, dtype=np.float64),
+         "positions": np.asarray(positions, dtype=np.int32)},
+        index=pd.DatetimeIndex(index, name="timestamp"),
+    )
+
+
+def _exit_fills(is_buy, exit_prices, entry_prices, quantities, slips):
+    """
+    Fill math for a batch of closing positions: (slippage-adjusted exit,
+    raw PnL, exit fee) per position.
+    """
+    adjusted = exit_prices * np.where(is_buy, 1 - slips, 1 + slips)
+    raw_pnl = np.where(is_buy, adjusted - entry_prices, entry_prices - adjusted) * quantities
+    exit_fee = adjusted * quantities * FEE_RATE
+    return adjusted, raw_pnl, exit_fee
+
+
 @dataclass
 class ClosedTrade:
     """Record of a completed round-trip trade."""
@@ -45,11 +141,92 @@ class ClosedTrade:
     confidence: float
 
 
+class TradeBuffer(Sequence):
+    """
+    Columnar store of closed trades: one NumPy array per ClosedTrade field,
+    written by index and grown by doubling. Reads as a sequence of
+    ClosedTrade, built on access.
+    """
+
+    _FIELDS = tuple(f.name for f in fields(ClosedTrade))
+    _TIME_FIELDS = ("entry_time", "exit_time")
+    _TEXT_FIELDS = ("symbol", "side", "strategy", "exit_reason")
+
+    def __init__(self, capacity: int = 256):
+        self._n = 0
+        self._cols = {name: self._empty(name, capacity) for name in self._FIELDS}
+
+    def _empty(self, name: str, capacity: int) -> np.ndarray:
+        if name in self._TIME_FIELDS:
+            return np.empty(capacity, dtype="datetime64[ns]")
+        if name in self._TEXT_FIELDS:
+            return np.empty(capacity, dtype=object)
+        return np.empty(capacity, dtype=np.float64)
+
+    def append(self, **trade):
+        """Record one trade; keywords are the ClosedTrade fields."""
+        if trade.keys() != self._cols.keys():
+            raise TypeError(f"TradeBuffer.append needs exactly the fields {self._FIELDS}")
+        k = self._n
+        if k == len(self._cols["pnl"]):
+            for name, col in self._cols.items():
+                grown = self._empty(name, 2 * len(col))
+                grown[:k] = col
+                self._cols[name] = grown
+        for name, value in trade.items():
+            if name in self._TIME_FIELDS:
+                value = pd.Timestamp(value).as_unit("ns").to_datetime64()
+            self._cols[name][k] = value
+        self._n = k + 1
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self._trade(i) for i in range(*k.indices(self._n))]
+        if k < 0:
+            k += self._n
+        if not 0 <= k < self._n:
+            raise IndexError("trade index out of range")
+        return self._trade(k)
+
+    def __iter__(self):
+        for k in range(self._n):
+            yield self._trade(k)
+
+    def column(self, name: str) -> np.ndarray:
+        """One field for every recorded trade (a view into the buffer; don't write to it)."""
+        return self._cols[name][:self._n]
+
+    def _trade(self, k: int) -> ClosedTrade:
+        values = {}
+        for name, col in self._cols.items():
+            if name in self._TIME_FIELDS:
+                values[name] = pd.Timestamp(col[k])
+            elif name in self._TEXT_FIELDS:
+                values[name] = col[k]
+            else:
+                values[name] = col[k].item()
+        return ClosedTrade(**values)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """One row per trade, one column per ClosedTrade field."""
+        return pd.DataFrame({name: col[:self._n] for name, col in self._cols.items()})
+
+    def to_arrow(self):
+        """The trades as a pyarrow.Table (needs pyarrow)."""
+        import pyarrow as pa
+        return pa.table({name: col[:self._n] for name, col in self._cols.items()})
+
+
 @dataclass
 class BacktestResult:
     """Container for all backtest outputs."""
-    trades: list[ClosedTrade] = field(default_factory=list)
-    equity_curve: list[dict] = field(default_factory=list)
+    trades: TradeBuffer = field(default_factory=TradeBuffer)
+    # One row per bar: equity, positions (open count); DatetimeIndex "timestamp"
+    equity_curve: pd.DataFrame = field(default_factory=lambda: _equity_frame([], [], []))
+    adaptive_snapshots: list[dict] = field(default_factory=list)  # {"timestamp", "adaptive"} ~daily
     initial_balance: float = 100.0
     final_balance: float = 100.0
     start_date: str = ""
@@ -81,18 +258,26 @@ class BacktestEngine:
         initial_balance: float = 100.0,
         dynamic_pairs: bool = False,
         adaptive: bool = False,
+        ohlcv: dict[tuple[str, str], pd.DataFrame] | None = None,
     ):
+        """
+        ohlcv: optional (symbol, timeframe) -> candles covering at least this
+            backtest's range (see data_requests); sliced instead of loading.
+        """
         self.dynamic_pairs = dynamic_pairs
         if dynamic_pairs:
             self.universe = list(getattr(settings, "PAIR_UNIVERSE", []))
             self.symbols = self.universe  # Load data for all universe pairs
-            self.active_pairs = list(getattr(settings, "CORE_PAIRS", []))
+            self._set_active_pairs(list(getattr(settings, "CORE_PAIRS", [])))
         else:
             self.symbols = symbols or settings.DEFAULT_PAIRS
-            self.active_pairs = list(self.symbols)
+            self._set_active_pairs(list(self.symbols))
 
         self.start_date = start_date
         self.end_date = end_date
+        # Parsed once; the loader takes epoch ms as well as date strings
+        self._start_ms = to_epoch_ms(start_date)
+        self._end_ms = to_epoch_ms(end_date)
         self.initial_balance = initial_balance
 
         # Reuse live components
@@ -103,8 +288,12 @@ class BacktestEngine:
         # Simulation state
         self.balance = initial_balance          # Free USDT balance
         self.trade_counter = 0
-        self.closed_trades: list[ClosedTrade] = []
-        self.equity_curve: list[dict] = []
+        self.closed_trades = TradeBuffer()
+        # Equity curve, filled by bar index (sized to the timeline in run())
+        self._equity_index: pd.DatetimeIndex = pd.DatetimeIndex([])
+        self._equity_values = np.empty(0, dtype=np.float64)
+        self._position_counts = np.empty(0, dtype=np.int32)
+        self._adaptive_snapshots: list[dict] = []
         self._pair_rotations: list[dict] = []
 
         # Pair scanner (only if dynamic)
@@ -136,9 +325,32 @@ class BacktestEngine:
             self._adaptive_log_interval = getattr(settings, "ADAPTIVE_LOG_INTERVAL_BARS", 16)
             self._last_adaptive_log_bar = 0
 
+        self._load_trade_settings()
+
         # Data
         self.data_loader = DataLoader()
+        self._ohlcv = ohlcv
         self.data: dict[str, dict[str, pd.DataFrame]] = {}  # symbol -> {tf: df}
+        # symbol -> {tf: int64 epoch-ns index values} for binary-searching bar positions
+        self._tf_index_values: dict[str, dict[str, np.ndarray]] = {}
+        # (symbol, tf) -> (end row, window): a higher-TF window only moves when its bar rolls over
+        self._htf_cursor: dict[tuple[str, str], tuple[int, pd.DataFrame]] = {}
+
+        # Struct-of-arrays view of the primary TF, aligned to the simulation timeline
+        self._ts_to_idx: dict = {}                  # timestamp -> row
+        self._cur_bar: tuple = (None, -1)           # (timestamp, row) of the bar being simulated
+        self._timeline_ns: np.ndarray | None = None # row -> epoch ns
+        self._sym_idx: dict[str, int] = {}          # symbol -> column
+        self._aligned: dict[str, np.ndarray] = {}   # field -> (bars, symbols) array
+        self._has_bar: np.ndarray | None = None     # (bars, symbols) bool: candle exists
+        self._row_idx: np.ndarray | None = None     # (bars, symbols) row in the symbol's df, -1 if absent
+        self._hlc: list[tuple[np.ndarray, ...] | None] = []  # per symbol column: float64 (high, low, close)
+        # Momentum decay: symbol -> (macd histogram, rsi) columns, None where the frame lacks one
+        self._decay_cols: dict[str, tuple[np.ndarray | None, np.ndarray | None]] = {}
+        # Dynamic pairs: symbol -> PairScanner input columns, see _scan_columns()
+        self._scan_cols: dict[str, tuple[np.ndarray, ...]] = {}
+        # Open positions as parallel arrays, rebuilt when Portfolio.layout_version changes
+        self._exit_layout: _ExitLayout | None = None
 
     def run(self) -> BacktestResult:
         """Execute the backtest and return results."""
@@ -148,51 +360,69 @@ class BacktestEngine:
         )
 
         # Step 1: Load all data
+        self._load_trade_settings()
         self._load_data()
 
         # Step 2: Get the primary timeframe bars for iteration
         primary_tf = settings.PRIMARY_TIMEFRAME
-        # Build a unified timeline from all symbols' primary TF data
-        all_timestamps = set()
-        for symbol in self.symbols:
-            if primary_tf in self.data.get(symbol, {}):
-                all_timestamps.update(self.data[symbol][primary_tf].index.tolist())
-
-        if not all_timestamps:
+        # Build a unified timeline from all symbols' primary TF data (sorted union, in C)
+        indexes = [
+            self.data[symbol][primary_tf].index
+            for symbol in self.symbols
+            if primary_tf in self.data.get(symbol, {})
+        ]
+        if not indexes:
             logger.error("No data loaded — cannot run backtest")
             return self._build_result()
 
-        timeline = sorted(all_timestamps)
+        # Symbols usually share the exact same bars; only merge when they differ
+        timeline = indexes[0]
+        if not all(index.equals(timeline) for index in indexes[1:]):
+            timeline = reduce(pd.DatetimeIndex.union, indexes)
         logger.info(f"Simulation timeline: {len(timeline)} bars from {timeline[0]} to {timeline[-1]}")
+        self._align_timeline(timeline)
+        self._htf_cursor.clear()
 
         # Step 3: Initialize risk manager
         self.risk_manager.reset_daily(self.initial_balance)
         self.risk_manager.update_peak(self.initial_balance)
-        current_day = None
+        # UTC day number of every bar, so the daily reset compares ints
+        day_keys = (self._timeline_ns // _NS_PER_DAY).tolist()
+        current_day = day_keys[0]
 
         # Step 4: Bar-by-bar simulation
         total_bars = len(timeline)
+        self._equity_index = timeline
+        self._equity_values = np.empty(total_bars, dtype=np.float64)
+        self._position_counts = np.empty(total_bars, dtype=np.int32)
         for bar_idx, timestamp in enumerate(timeline):
-            if bar_idx % 1000 == 0:
+            self._cur_bar = (timestamp, bar_idx)
+            # Closes of the symbols held at bar start; every valuation below reuses them
+            # (exits only shrink that set, entries come after the last valuation)
+            prices = self._get_current_prices(timestamp)
+            bar_day = day_keys[bar_idx]
+            new_day = bar_day != current_day
+            report = bar_idx % 1000 == 0
+            if new_day or report:
+                # Value before this bar's exits, shared by the progress line and the daily reset
+                opening_value = self._calculate_portfolio_value(timestamp, prices)
+            if report:
                 pct = bar_idx / total_bars * 100
                 print(f"  Progress: {bar_idx}/{total_bars} bars ({pct:.0f}%) | "
                       f"Trades: {len(self.closed_trades)} | "
-                      f"Balance: ${self._calculate_portfolio_value(timestamp):.2f}",
+                      f"Balance: ${opening_value:.2f}",
                       flush=True)
             # -- Daily reset --
-            bar_day = timestamp.date() if hasattr(timestamp, 'date') else pd.Timestamp(timestamp).date()
-            if current_day is None:
+            if new_day:
                 current_day = bar_day
-            elif bar_day != current_day:
-                current_day = bar_day
-                portfolio_value = self._calculate_portfolio_value(timestamp)
-                self.risk_manager.reset_daily(portfolio_value)
+                self.risk_manager.reset_daily(opening_value)
 
             # -- Check open positions for SL/TP exits --
-            self._check_exits(timestamp, bar_idx)
+            if self.portfolio.positions:
+                self._check_exits(timestamp, bar_idx)
 
-            # -- Update portfolio value & risk --
-            portfolio_value = self._calculate_portfolio_value(timestamp)
+            # -- Update portfolio value & risk (balance/positions changed, prices didn't) --
+            portfolio_value = self._calculate_portfolio_value(timestamp, prices)
             self.risk_manager.update_peak(portfolio_value)
 
             # -- Circuit breaker check --
@@ -215,28 +445,28 @@ class BacktestEngine:
             if self.adaptive_controller is not None:
                 if (bar_idx - self._last_adaptive_log_bar) >= self._adaptive_log_interval:
                     self._last_adaptive_log_bar = bar_idx
-                    overrides = self.adaptive_controller.compute_overrides()
-                    state_str = self.adaptive_controller.format_state(overrides)
+                    # Overrides are pure; only build the state text on bars that print it
                     if bar_idx % 500 == 0:
+                        overrides = self.adaptive_controller.compute_overrides()
+                        state_str = self.adaptive_controller.format_state(overrides)
                         print(f"  [{bar_idx}] {state_str}", flush=True)
 
             # -- Record equity snapshot (every bar) --
-            equity_record = {
-                "timestamp": timestamp,
-                "equity": portfolio_value,
-                "positions": self.portfolio.open_position_count,
-            }
+            self._equity_values[bar_idx] = portfolio_value
+            self._position_counts[bar_idx] = self.portfolio.open_position_count
             if self.adaptive_controller is not None and bar_idx % 96 == 0:
                 overrides = self.adaptive_controller.compute_overrides()
-                equity_record["adaptive"] = {
-                    "leverage_scale": overrides.leverage_scale,
-                    "sl_atr": dict(overrides.sl_atr_multiplier),
-                    "rr_ratio": dict(overrides.rr_ratio),
-                    "enabled": dict(overrides.strategy_enabled),
-                    "confidence": dict(overrides.min_confidence),
-                    "size_scale": dict(overrides.position_size_scale),
-                }
-            self.equity_curve.append(equity_record)
+                self._adaptive_snapshots.append({
+                    "timestamp": timestamp,
+                    "adaptive": {
+                        "leverage_scale": overrides.leverage_scale,
+                        "sl_atr": dict(overrides.sl_atr_multiplier),
+                        "rr_ratio": dict(overrides.rr_ratio),
+                        "enabled": dict(overrides.strategy_enabled),
+                        "confidence": dict(overrides.min_confidence),
+                        "size_scale": dict(overrides.position_size_scale),
+                    },
+                })
 
         # Close any remaining open positions at last bar's close
         self._close_remaining(timeline[-1])
@@ -249,39 +479,147 @@ class BacktestEngine:
         )
         return result
 
+    def _load_trade_settings(self):
+        """Read the settings the per-bar entry/exit path uses (scripts override them before run())."""
+        # Trade open/close lines are f-strings; only build them when DEBUG would emit them
+        self._debug = logger.isEnabledFor(logging.DEBUG)
+        # Entries: indicator warm-up and per-strategy SL/TP bases
+        self._min_bars = max(settings.ADX_PERIOD * 2, settings.EMA_TREND,
+                             getattr(settings, "SR_LOOKBACK", 50)) + 10
+        self._sl_map = getattr(settings, "STRATEGY_SL_ATR_MULTIPLIER", {})
+        self._rr_map = getattr(settings, "STRATEGY_REWARD_RISK_RATIO", {})
+        self._min_sl_pct = getattr(settings, "MIN_SL_DISTANCE_PCT", 0.015)
+        self._override_cache = (None, {})
+        # Exits and fills
+        self._trailing_enabled = getattr(settings, "TRAILING_STOP_ENABLED", False)
+        self._hybrid = getattr(settings, "TRAILING_HYBRID", False)
+        self._staircase = getattr(settings, "STAIRCASE_PROFIT_ENABLED", False)
+        self._staircase_close_pct = getattr(settings, "STAIRCASE_CLOSE_PCT", 0.50)
+        self._momentum_decay = getattr(settings, "MOMENTUM_DECAY_EXIT", False)
+        self._breakeven_rr = getattr(settings, "BREAKEVEN_RR", 1.5)
+        self._trail_mult = getattr(settings, "TRAILING_STOP_ATR_MULTIPLIER", 1.0)
+        self._sl_mult_default = getattr(settings, "STOP_LOSS_ATR_MULTIPLIER", 0.75)
+        self._trail_vol_scale = getattr(settings, "TRAIL_VOL_SCALE", {})
+        self._leverage = getattr(settings, "LEVERAGE", 1)
+
     def _load_data(self):
         """Download/load all required data."""
-        from datetime import datetime, timedelta
+        requests = data_requests(self.symbols, self._start_ms, self._end_ms)
+        if self._ohlcv is None:
+            frames = self.data_loader.load_many(requests)
+        else:
+            # Slices of data fetched once for a wider range (walk-forward); anything
+            # it lacks goes through the loader as usual
+            frames = [self._prefetched(req) for req in requests]
+            missing = [k for k, df in enumerate(frames) if df.empty]
+            for k, df in zip(missing, self.data_loader.load_many([requests[k] for k in missing])):
+                frames[k] = df
+
+        # Pre-compute indicators on the full dataset for primary TF (one symbol per process)
+        primary = [
+            k for k, (req, df) in enumerate(zip(requests, frames))
+            if req.timeframe == settings.PRIMARY_TIMEFRAME and not df.empty
+        ]
+        for k, df in zip(primary, self._precompute_indicators([frames[k] for k in primary])):
+            frames[k] = df
+
+        frames = iter(frames)
         for symbol in self.symbols:
             print(f"  Loading data for {symbol}...")
             self.data[symbol] = {}
+            self._tf_index_values[symbol] = {}
             for tf in settings.TIMEFRAMES:
-                # Daily data needs extra lookback for EMA50 computation
-                # Use download() (not load()) to ensure full date coverage with gap-filling
-                if tf == "1d":
-                    ema_slow = getattr(settings, "DAILY_EMA_SLOW", 50)
-                    lookback_days = ema_slow + 30  # Extra buffer
-                    start_dt = datetime.strptime(self.start_date, "%Y-%m-%d")
-                    extended_start = (start_dt - timedelta(days=lookback_days)).strftime("%Y-%m-%d")
-                    df = self.data_loader.download(symbol, tf, extended_start, self.end_date)
-                else:
-                    df = self.data_loader.load(symbol, tf, self.start_date, self.end_date)
+                df = next(frames)
                 if not df.empty:
-                    # Pre-compute indicators on the full dataset for primary TF
-                    if tf == settings.PRIMARY_TIMEFRAME:
-                        df = add_all_indicators(df)
+                    self._tf_index_values[symbol][tf] = df.index.values.astype("datetime64[ns]").view("i8")
                     self.data[symbol][tf] = df
                     print(f"    {tf}: {len(df)} candles")
                 else:
                     print(f"    {tf}: NO DATA")
 
-    def _get_candle(self, symbol: str, timestamp) -> pd.Series | None:
-        """Get the candle at a specific timestamp for a symbol."""
+    def _prefetched(self, req: FetchRequest) -> pd.DataFrame:
+        df = self._ohlcv.get((req.symbol, req.timeframe))
+        if df is None or df.empty:
+            return pd.DataFrame()
+        return self.data_loader.filter_range(df, to_epoch_ms(req.start_date), to_epoch_ms(req.end_date))
+
+    @staticmethod
+    def _precompute_indicators(frames: list[pd.DataFrame]) -> list[pd.DataFrame]:
+        """add_all_indicators on each frame, across a process pool when there are spare cores."""
+        workers = min(len(frames), os.cpu_count() or 1)
+        # Inside a pool worker (walk-forward windows, --parallel) the cores are
+        # already taken; a nested pool would only add processes and pickling.
+        # Without fork, spawned workers would re-run unguarded calling scripts
+        if workers <= 1 or FORK_CONTEXT is None or mp.parent_process() is not None:
+            return [_with_indicators(df) for df in frames]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=FORK_CONTEXT) as pool:
+            return list(pool.map(_with_indicators, frames))
+
+    def _align_timeline(self, timeline: pd.DatetimeIndex):
+        """Build the (bars x symbols) price arrays the bar loop indexes into."""
         primary_tf = settings.PRIMARY_TIMEFRAME
-        df = self.data.get(symbol, {}).get(primary_tf)
-        if df is None or timestamp not in df.index:
+        n_bars, n_syms = len(timeline), len(self.symbols)
+        self._ts_to_idx = dict(zip(timeline, range(n_bars)))
+        self._cur_bar = (None, -1)
+        self._exit_layout = None
+        self._timeline_ns = timeline.as_unit("ns").asi8
+        self._sym_idx = {symbol: j for j, symbol in enumerate(self.symbols)}
+        self._aligned = {
+            f: np.full((n_bars, n_syms), np.nan, dtype=np.float64) for f in _BAR_FIELDS
+        }
+        self._has_bar = np.zeros((n_bars, n_syms), dtype=bool)
+        self._row_idx = np.full((n_bars, n_syms), -1, dtype=np.int64)
+        self._hlc = [None] * n_syms
+        self._scan_cols = {}
+        self._decay_cols = {}
+
+        for j, symbol in enumerate(self.symbols):
+            df = self.data.get(symbol, {}).get(primary_tf)
+            if df is None:
+                continue
+            # Missing bars stay absent (not forward-filled): no candle -> no exit check/price
+            rows = df.index.get_indexer(timeline)
+            present = rows >= 0
+            self._row_idx[:, j] = rows
+            self._hlc[j] = tuple(df[f].to_numpy(dtype=np.float64) for f in _Bar._fields)
+            if self._momentum_decay:
+                self._decay_cols[symbol] = tuple(
+                    df[c].to_numpy(dtype=np.float64) if c in df.columns else None
+                    for c in ("macd_histogram", f"rsi_{settings.RSI_PERIOD}")
+                )
+            if self.dynamic_pairs:
+                self._scan_cols[symbol] = tuple(df[c].to_numpy(dtype=np.float64) for c in _scan_columns())
+            self._has_bar[:, j] = present
+            for f in _BAR_FIELDS:
+                self._aligned[f][present, j] = df[f].to_numpy(dtype=np.float64)[rows[present]]
+
+    def _timeline_row(self, timestamp) -> int | None:
+        """Timeline row of timestamp; the bar being simulated skips the dict lookup."""
+        cur_ts, cur_i = self._cur_bar
+        if timestamp is cur_ts:
+            return cur_i
+        return self._ts_to_idx.get(timestamp)
+
+    def _timestamp_ns(self, timestamp) -> int:
+        """Epoch nanoseconds of timestamp, read from the timeline when it is a simulated bar."""
+        i = self._timeline_row(timestamp)
+        if i is not None:
+            return int(self._timeline_ns[i])
+        return pd.Timestamp(timestamp).as_unit("ns").value
+
+    def _get_candle(self, symbol: str, timestamp) -> _Bar | None:
+        """Get the candle at a specific timestamp for a symbol."""
+        i = self._timeline_row(timestamp)
+        j = self._sym_idx.get(symbol)
+        if i is None or j is None or not self._has_bar[i, j]:
             return None
-        return df.loc[timestamp]
+        return self._bar(i, j)
+
+    def _bar(self, i: int, j: int) -> _Bar:
+        """Full-precision candle for timeline row i, symbol column j."""
+        high, low, close = self._hlc[j]
+        row = self._row_idx[i, j]
+        return _Bar(high[row], low[row], close[row])
 
     def _get_indicator_window(self, symbol: str, timestamp, lookback: int = 200) -> pd.DataFrame:
         """Get a sliding window of candles with indicators, up to and including timestamp."""
@@ -290,160 +628,217 @@ class BacktestEngine:
         if df is None:
             return pd.DataFrame()
 
-        # Get index position of timestamp
-        loc = df.index.get_loc(timestamp)
+        # Index position of timestamp (precomputed row map, else binary search)
+        i = self._timeline_row(timestamp)
+        j = self._sym_idx.get(symbol)
+        loc = self._row_idx[i, j] if i is not None and j is not None else -1
+        if loc < 0:
+            values = self._tf_index_values[symbol][primary_tf]
+            ts = self._timestamp_ns(timestamp)
+            loc = int(np.searchsorted(values, ts, side="left"))
+            if loc == len(values) or values[loc] != ts:
+                raise KeyError(timestamp)  # exact match required, as with Index.get_loc
         start = max(0, loc - lookback + 1)
-        window = df.iloc[start:loc + 1].copy()
-        return window
+        # Indicators are precomputed on the full frame, so consumers only read the
+        # window — return the slice itself instead of copying 200 rows per call
+        return df.iloc[start:loc + 1]
 
     def _get_higher_tf_data(self, symbol: str, timestamp) -> dict[str, pd.DataFrame]:
         """Get higher timeframe data up to timestamp for MTF analysis."""
         higher_tf = {}
+        ts = self._timestamp_ns(timestamp)
+        min_htf_bars = max(settings.EMA_TREND, settings.ADX_PERIOD * 2) + 10
         for tf in settings.TIMEFRAMES:
             if tf == settings.PRIMARY_TIMEFRAME:
                 continue
             df = self.data.get(symbol, {}).get(tf)
             if df is None or df.empty:
                 continue
-            # Filter to candles at or before the current timestamp
-            mask = df.index <= timestamp
-            filtered = df[mask]
-            min_htf_bars = max(settings.EMA_TREND, settings.ADX_PERIOD * 2) + 10
-            if not filtered.empty and len(filtered) >= min_htf_bars:
-                higher_tf[tf] = filtered.tail(200).copy()
+            # Candles at or before the current timestamp: binary search on the sorted index
+            end = int(np.searchsorted(self._tf_index_values[symbol][tf], ts, side="right"))
+            if end >= min_htf_bars:
+                cursor = self._htf_cursor.get((symbol, tf))
+                if cursor is None or cursor[0] != end:
+                    # Shallow copy: the MTF filter adds EMA/ADX columns to it, the data
+                    # is shared. Reusing it until the next HTF bar also reuses those columns
+                    cursor = (end, df.iloc[max(0, end - 200):end].copy(deep=False))
+                    self._htf_cursor[(symbol, tf)] = cursor
+                higher_tf[tf] = cursor[1]
         return higher_tf
 
-    def _get_current_prices(self, timestamp) -> dict[str, float]:
-        """Get the close price at timestamp for all symbols with data."""
+    def _get_current_prices(self, timestamp, symbols=None) -> dict[str, float]:
+        """Close price at timestamp for each symbol with a bar (default: symbols with open positions)."""
+        i = self._timeline_row(timestamp)
+        if i is None:
+            return {}
+        if symbols is None:
+            symbols = self.portfolio.positions
+        closes, has_bar = self._aligned["close"][i], self._has_bar[i]
         prices = {}
-        # Include all symbols we have data for (positions may exist on deactivated pairs)
-        symbols_to_check = set(self.symbols) | set(self.portfolio.positions.keys())
-        for symbol in symbols_to_check:
-            candle = self._get_candle(symbol, timestamp)
-            if candle is not None:
-                prices[symbol] = candle["close"]
+        for symbol in symbols:
+            j = self._sym_idx.get(symbol)
+            if j is not None and has_bar[j]:
+                prices[symbol] = closes[j]
         return prices
 
-    def _calculate_portfolio_value(self, timestamp) -> float:
-        """Calculate total portfolio value at a given timestamp."""
-        prices = self._get_current_prices(timestamp)
+    def _calculate_portfolio_value(self, timestamp, prices: dict[str, float] | None = None) -> float:
+        """Calculate total portfolio value at a given timestamp (prices: precomputed for it)."""
+        if not self.portfolio.positions:
+            return self.balance
+        if prices is None:
+            prices = self._get_current_prices(timestamp)
         return self.portfolio.calculate_portfolio_value(self.balance, prices)
 
     def _check_exits(self, timestamp, bar_index: int = 0):
         """Check all open positions for stop-loss, take-profit, or trailing stop hits."""
-        symbols_to_close = []
-        trailing_enabled = getattr(settings, "TRAILING_STOP_ENABLED", False)
-
-        hybrid = getattr(settings, "TRAILING_HYBRID", False)
+        if not self.portfolio.positions:
+            return
+        i = self._timeline_row(timestamp)
+        if i is None:
+            return
+        layout = self._exit_layout
+        if layout is None or layout.version != self.portfolio.layout_version:
+            layout = self._exit_layout = self._build_exit_layout()
+        positions, cols, is_buy = layout.positions, layout.cols, layout.is_buy
 
-        for symbol, position in self.portfolio.positions.items():
-            candle = self._get_candle(symbol, timestamp)
-            if candle is None:
+        symbols_to_close = []
+        to_trail = []
+        trailing_enabled = self._trailing_enabled
+        hybrid = self._hybrid
+        staircase = self._staircase
+        momentum_decay = self._momentum_decay
+
+        # SL/TP hits for every open position in one compiled pass
+        present = layout.known & self._has_bar[i, cols]
+        highs = self._aligned["high"][i, cols]
+        lows = self._aligned["low"][i, cols]
+        stops = np.array([position.stop_loss for _, position in positions], dtype=np.float64)
+        targets = np.array([position.take_profit for _, position in positions], dtype=np.float64)
+        hit_sl, hit_tp = exit_hits_nb(highs, lows, present, is_buy, stops, targets)
+
+        for k, (symbol, position) in enumerate(positions):
+            if not present[k]:
                 continue
+            candle = self._bar(i, cols[k])
 
             exit_price = None
             exit_reason = None
 
-            if position.side == "buy":
-                # Check stop-loss first using CURRENT stop level (worst case)
-                if candle["low"] <= position.stop_loss:
-                    exit_price = position.stop_loss
-                    exit_reason = "trailing_stop" if position.trailing_activated else "stop_loss"
-                # Check take-profit
-                elif candle["high"] >= position.take_profit:
-                    staircase = getattr(settings, "STAIRCASE_PROFIT_ENABLED", False)
-                    if staircase and not position.partial_closed:
-                        exit_price = position.take_profit
-                        exit_reason = "staircase_partial"
-                    elif trailing_enabled and hybrid and not position.trailing_activated:
-                        # Hybrid: TP hit activates trailing
-                        position.trailing_activated = True
-                        position.stop_loss = position.take_profit
-                        position.highest_price = max(position.highest_price, candle["high"])
-                    elif not trailing_enabled or not hybrid:
-                        exit_price = position.take_profit
-                        exit_reason = "take_profit"
-            else:  # sell/short
-                if candle["high"] >= position.stop_loss:
-                    exit_price = position.stop_loss
-                    exit_reason = "trailing_stop" if position.trailing_activated else "stop_loss"
-                elif candle["low"] <= position.take_profit:
-                    staircase = getattr(settings, "STAIRCASE_PROFIT_ENABLED", False)
-                    if staircase and not position.partial_closed:
-                        exit_price = position.take_profit
-                        exit_reason = "staircase_partial"
-                    elif trailing_enabled and hybrid and not position.trailing_activated:
-                        position.trailing_activated = True
-                        position.stop_loss = position.take_profit
-                        position.lowest_price = min(position.lowest_price, candle["low"])
-                    elif not trailing_enabled or not hybrid:
-                        exit_price = position.take_profit
-                        exit_reason = "take_profit"
+            if hit_sl[k]:
+                exit_price = position.stop_loss
+                exit_reason = "trailing_stop" if position.trailing_activated else "stop_loss"
+            elif hit_tp[k]:
+                if staircase and not position.partial_closed:
+                    exit_price = position.take_profit
+                    exit_reason = "staircase_partial"
+                elif trailing_enabled and hybrid and not position.trailing_activated:
+                    # Hybrid: TP hit activates trailing
+                    position.trailing_activated = True
+                    position.stop_loss = position.take_profit
+                    if is_buy[k]:
+                        position.highest_price = max(position.highest_price, candle.high)
+                    else:
+                        position.lowest_price = min(position.lowest_price, candle.low)
+                elif not trailing_enabled or not hybrid:
+                    exit_price = position.take_profit
+                    exit_reason = "take_profit"
 
             # Momentum decay exit (backtest)
-            if exit_price is None and position.strategy == "momentum" and getattr(settings, "MOMENTUM_DECAY_EXIT", False):
-                if self._check_momentum_decay(position, candle, symbol, timestamp):
-                    exit_price = candle["close"]
+            if exit_price is None and position.strategy == "momentum" and momentum_decay:
+                if self._check_momentum_decay(position, candle, symbol, i):
+                    exit_price = candle.close
                     exit_reason = "momentum_decay"
 
             if exit_price is not None:
                 symbols_to_close.append((symbol, exit_price, exit_reason, timestamp))
             elif trailing_enabled:
                 # Not stopped out this bar — update trailing for next bar
-                self._update_trailing_stop(position, candle)
-
+                to_trail.append((position, candle))
+        self._update_trailing_stops(to_trail)
+
+        # Fill math for every full close on this bar in one batch
+        fills = iter(self._close_fills([
+            (self.portfolio.positions[symbol], exit_price, exit_reason)
+            for symbol, exit_price, exit_reason, _ in symbols_to_close
+            if exit_reason != "staircase_partial"
+        ]))
         for symbol, exit_price, exit_reason, ts in symbols_to_close:
             if exit_reason == "staircase_partial":
                 self._partial_close_position(symbol, exit_price, ts, bar_index)
             else:
-                self._close_position(symbol, exit_price, exit_reason, ts, bar_index)
-
-    def _update_trailing_stop(self, position: Position, candle: pd.Series):
-        """Update trailing stop using candle high/low (backtest version)."""
-        breakeven_rr = getattr(settings, "BREAKEVEN_RR", 1.5)
-        trail_mult = getattr(settings, "TRAILING_STOP_ATR_MULTIPLIER", 1.0)
-        sl_mult = position.sl_atr_multiplier if position.sl_atr_multiplier > 0 else getattr(settings, "STOP_LOSS_ATR_MULTIPLIER", 0.75)
-
-        if position.initial_risk <= 0 or sl_mult <= 0:
+                self._close_position(symbol, exit_price, exit_reason, ts, bar_index, fill=next(fills))
+
+    def _build_exit_layout(self) -> _ExitLayout:
+        """Snapshot the open positions' fixed fields (order, symbol column, side)."""
+        positions = list(self.portfolio.positions.items())
+        cols = np.array([self._sym_idx.get(symbol, -1) for symbol, _ in positions], dtype=np.int64)
+        known = cols >= 0
+        cols[~known] = 0
+        is_buy = np.array([position.side == "buy" for _, position in positions], dtype=bool)
+        return _ExitLayout(self.portfolio.layout_version, positions, cols, known, is_buy)
+
+    @staticmethod
+    def _close_fills(closes: list[tuple[Position, float, str]]) -> list[tuple[float, float, float]]:
+        """(adjusted exit, raw PnL, exit fee) for each (position, exit price, reason)."""
+        if not closes:
+            return []
+        # Stop-market fills slip more than limit/trailing fills (fast-move execution)
+        adjusted, raw_pnl, exit_fee = _exit_fills(
+            np.array([position.side == "buy" for position, _, _ in closes]),
+            np.array([exit_price for _, exit_price, _ in closes], dtype=np.float64),
+            np.array([position.entry_price for position, _, _ in closes], dtype=np.float64),
+            np.array([position.quantity for position, _, _ in closes], dtype=np.float64),
+            np.array([
+                STOP_SLIPPAGE_RATE if reason in ("stop_loss", "exchange_stop") else SLIPPAGE_RATE
+                for _, _, reason in closes
+            ]),
+        )
+        return list(zip(adjusted.tolist(), raw_pnl.tolist(), exit_fee.tolist()))
+
+    def _update_trailing_stops(self, pending: list[tuple[Position, _Bar]]):
+        """Update trailing stops from each position's candle high/low (backtest version)."""
+        trail_mult = self._trail_mult
+        default_sl_mult = self._sl_mult_default
+        vol_scales = self._trail_vol_scale
+
+        trailing = []
+        for position, candle in pending:
+            sl_mult = position.sl_atr_multiplier if position.sl_atr_multiplier > 0 else default_sl_mult
+            if position.initial_risk <= 0 or sl_mult <= 0:
+                continue
+            trail_distance = position.initial_risk * (trail_mult / sl_mult)
+            # Vol-aware scaling: widen/tighten trail based on regime at entry
+            trail_distance *= vol_scales.get(position.entry_regime, 1.0)
+            trailing.append((position, candle, trail_distance))
+        if not trailing:
             return
-        trail_distance = position.initial_risk * (trail_mult / sl_mult)
-
-        # Vol-aware scaling: widen/tighten trail based on regime at entry
-        vol_scale = getattr(settings, "TRAIL_VOL_SCALE", {}).get(position.entry_regime, 1.0)
-        trail_distance *= vol_scale
-
-        if position.side == "buy":
-            # Update highest price from candle high
-            if candle["high"] > position.highest_price:
-                position.highest_price = candle["high"]
-
-            profit = position.highest_price - position.entry_price
-            if not position.trailing_activated and profit >= breakeven_rr * position.initial_risk:
-                position.trailing_activated = True
-                position.stop_loss = max(position.stop_loss, position.entry_price)
-
-            if position.trailing_activated:
-                new_stop = position.highest_price - trail_distance
-                if new_stop > position.stop_loss:
-                    position.stop_loss = new_stop
-        else:
-            # Update lowest price from candle low
-            if candle["low"] < position.lowest_price:
-                position.lowest_price = candle["low"]
-
-            profit = position.entry_price - position.lowest_price
-            if not position.trailing_activated and profit >= breakeven_rr * position.initial_risk:
-                position.trailing_activated = True
-                position.stop_loss = min(position.stop_loss, position.entry_price)
 
-            if position.trailing_activated:
-                new_stop = position.lowest_price + trail_distance
-                if new_stop < position.stop_loss:
-                    position.stop_loss = new_stop
-
-    def _check_momentum_decay(self, position: Position, candle: pd.Series, symbol: str, timestamp) -> bool:
+        positions = [position for position, _, _ in trailing]
+        stops = np.array([p.stop_loss for p in positions], dtype=np.float64)
+        highest = np.array([p.highest_price for p in positions], dtype=np.float64)
+        lowest = np.array([p.lowest_price for p in positions], dtype=np.float64)
+        activated = np.array([p.trailing_activated for p in positions])
+        trail_stops_nb(
+            np.array([p.side == "buy" for p in positions]),
+            np.array([p.entry_price for p in positions], dtype=np.float64),
+            stops, highest, lowest, activated,
+            np.array([p.initial_risk for p in positions], dtype=np.float64),
+            np.array([d for _, _, d in trailing], dtype=np.float64),
+            np.array([c.high for _, c, _ in trailing], dtype=np.float64),
+            np.array([c.low for _, c, _ in trailing], dtype=np.float64),
+            float(self._breakeven_rr),
+        )
+        for position, stop, high, low, active in zip(
+            positions, stops.tolist(), highest.tolist(), lowest.tolist(), activated.tolist()
+        ):
+            position.stop_loss = stop
+            position.highest_price = high
+            position.lowest_price = low
+            position.trailing_activated = active
+
+    def _check_momentum_decay(self, position: Position, candle: _Bar, symbol: str, i: int) -> bool:
         """Check if momentum is decaying while position is in profit -> early exit."""
-        current_price = candle["close"]
+        current_price = candle.close
         pnl = position.unrealized_pnl(current_price)
         if pnl <= 0:
             return False
@@ -453,13 +848,14 @@ class BacktestEngine:
         if pnl < min_profit:
             return False
 
-        df = self._get_indicator_window(symbol, timestamp, lookback=30)
-        if df.empty or len(df) < 15:
+        # Needs 15+ bars of history; read the columns at timeline row i directly
+        loc = self._row_idx[i, self._sym_idx[symbol]]
+        if loc < 14:
             return False
 
-        latest = df.iloc[-1]
-        macd_hist = latest.get("macd_histogram", 0)
-        rsi = latest.get(f"rsi_{settings.RSI_PERIOD}", 50)
+        macd_col, rsi_col = self._decay_cols[symbol]
+        macd_hist = macd_col[loc] if macd_col is not None else 0
+        rsi = rsi_col[loc] if rsi_col is not None else 50
 
         if position.side == "buy":
             return macd_hist < 0 and rsi < 40
@@ -470,21 +866,33 @@ class BacktestEngine:
         """Rescan universe and update active pairs list."""
         self.last_scan_bar = bar_idx
 
-        # Build indicator snapshots for all universe pairs at this timestamp
-        universe_data = {}
+        # Score every universe pair straight from its precomputed indicator
+        # columns (what PairScanner.score_pair reads off a 200-bar window)
+        scanner = self.smart_selector.scanner if self.smart_selector is not None else self.pair_scanner
+        i = self._timeline_row(timestamp)
+        min_bars = settings.EMA_TREND + 10
+        scores = {}
         for symbol in self.universe:
-            df = self._get_indicator_window(symbol, timestamp)
-            if not df.empty and len(df) >= settings.EMA_TREND + 10:
-                universe_data[symbol] = df
+            cols = self._scan_cols.get(symbol)
+            if cols is None or i is None:
+                continue
+            loc = self._row_idx[i, self._sym_idx[symbol]]
+            if loc < 0 or min(loc + 1, 200) < min_bars:
+                continue
+            adx, volume_ratio, ema_fast, ema_slow, atr, close = cols
+            scores[symbol] = scanner.score_values(
+                adx[loc], volume_ratio[loc], ema_fast[loc], ema_slow[loc], atr[loc],
+                close[loc], close[loc - DIRECTIONAL_LOOKBACK] if loc >= DIRECTIONAL_LOOKBACK else np.nan,
+            )
 
-        if not universe_data:
+        if not scores:
             return
 
         if self.smart_selector is not None:
             # Smart rotation with hysteresis
             open_positions = set(self.portfolio.positions.keys())
             new_active, metadata = self.smart_selector.smart_select(
-                data=universe_data,
+                data={},
                 current_active=self.active_pairs,
                 core_pairs=list(getattr(settings, "CORE_PAIRS", [])),
                 max_active=getattr(settings, "MAX_ACTIVE_PAIRS", 10),
@@ -492,6 +900,7 @@ class BacktestEngine:
                 min_holding_scans=getattr(settings, "SMART_MIN_HOLDING_SCANS", 2),
                 smoothing=getattr(settings, "SMART_SCORE_SMOOTHING", 3),
                 open_positions=open_positions,
+                scores=scores,
             )
 
             added = metadata.get("added", [])
@@ -513,29 +922,35 @@ class BacktestEngine:
                 "metadata": metadata,
             })
 
-            self.active_pairs = new_active
+            self._set_active_pairs(new_active)
         else:
             # Legacy rotation (no hysteresis)
-            new_active = self.pair_scanner.select_active_pairs(universe_data)
+            new_active = self.pair_scanner.select_active_pairs({}, scores=scores)
 
-            added = set(new_active) - set(self.active_pairs)
-            removed = set(self.active_pairs) - set(new_active)
+            new_set = frozenset(new_active)
+            added = sorted(s for s in new_set if s not in self._active_pairs_set)
+            removed = sorted(s for s in self._active_pairs_set if s not in new_set)
 
             if added or removed:
                 print(f"  Pair rotation at bar {bar_idx}: "
-                      f"+{sorted(added) if added else '[]'} "
-                      f"-{sorted(removed) if removed else '[]'}",
+                      f"+{added if added else '[]'} "
+                      f"-{removed if removed else '[]'}",
                       flush=True)
 
             self._pair_rotations.append({
                 "bar_idx": bar_idx,
                 "timestamp": timestamp,
                 "active": list(new_active),
-                "added": sorted(added),
-                "removed": sorted(removed),
+                "added": added,
+                "removed": removed,
             })
 
-            self.active_pairs = new_active
+            self._set_active_pairs(new_active)
+
+    def _set_active_pairs(self, pairs: list[str]):
+        """Replace the active pair list, keeping its membership set in step."""
+        self.active_pairs = pairs
+        self._active_pairs_set = frozenset(pairs)
 
     def _partial_close_position(self, symbol: str, exit_price: float, timestamp, bar_index: int = 0):
         """Staircase: close partial qty at TP, move SL to breakeven, trail remainder."""
@@ -543,35 +958,31 @@ class BacktestEngine:
         if position is None or position.partial_closed:
             return
 
-        close_pct = getattr(settings, "STAIRCASE_CLOSE_PCT", 0.50)
+        close_pct = self._staircase_close_pct
         qty_to_close = position.quantity * close_pct
 
-        # Apply slippage to exit
+        # Slippage-adjusted exit; PnL on the closed portion only
         if position.side == "buy":
             adjusted_exit = exit_price * (1 - SLIPPAGE_RATE)
-        else:
-            adjusted_exit = exit_price * (1 + SLIPPAGE_RATE)
-
-        # PnL on closed portion only
-        if position.side == "buy":
             raw_pnl = (adjusted_exit - position.entry_price) * qty_to_close
         else:
+            adjusted_exit = exit_price * (1 + SLIPPAGE_RATE)
             raw_pnl = (position.entry_price - adjusted_exit) * qty_to_close
 
         exit_fee = adjusted_exit * qty_to_close * FEE_RATE
         net_pnl = raw_pnl - exit_fee
 
         # Return partial margin + PnL to balance
-        leverage = getattr(settings, "LEVERAGE", 1)
-        partial_margin = (position.entry_price * qty_to_close) / leverage
+        notional = position.entry_price * qty_to_close
+        partial_margin = notional / self._leverage
         self.balance += partial_margin + net_pnl
 
-        entry_fee = position.entry_price * qty_to_close * FEE_RATE
+        entry_fee = notional * FEE_RATE
         total_fees = entry_fee + exit_fee
         pnl_pct = net_pnl / partial_margin if partial_margin > 0 else 0.0
 
         # Record as a closed trade
-        trade = ClosedTrade(
+        self.closed_trades.append(
             symbol=symbol,
             side=position.side,
             strategy=position.strategy,
@@ -586,7 +997,6 @@ class BacktestEngine:
             exit_reason="staircase_partial",
             confidence=position.confidence,
         )
-        self.closed_trades.append(trade)
 
         # Update position: reduce qty, flag partial, activate trailing, SL to breakeven
         remaining_qty = position.quantity - qty_to_close
@@ -623,13 +1033,17 @@ class BacktestEngine:
                 reward=reward,
             ))
 
-        logger.debug(
-            f"STAIRCASE {position.side.upper()} {symbol}: closed {close_pct:.0%} @ {adjusted_exit:.4f} | "
-            f"PnL: ${net_pnl:.4f} ({pnl_pct:.2%}) | Remaining: {remaining_qty:.6f}"
-        )
+        if self._debug:
+            logger.debug(
+                f"STAIRCASE {position.side.upper()} {symbol}: closed {close_pct:.0%} @ {adjusted_exit:.4f} | "
+                f"PnL: ${net_pnl:.4f} ({pnl_pct:.2%}) | Remaining: {remaining_qty:.6f}"
+            )
 
-    def _close_position(self, symbol: str, exit_price: float, reason: str, timestamp, bar_index: int = 0):
-        """Close a position and record the trade."""
+    def _close_position(
+        self, symbol: str, exit_price: float, reason: str, timestamp, bar_index: int = 0,
+        fill: tuple[float, float, float] | None = None,
+    ):
+        """Close a position and record the trade (fill: precomputed by _close_fills)."""
         position = self.portfolio.remove_position(symbol)
         if position is None:
             return
@@ -640,26 +1054,13 @@ class BacktestEngine:
         elif reason in ("take_profit", "trailing_stop", "momentum_decay"):
             self.risk_manager.register_win(symbol, bar_index)
 
-        # Stop-market fills slip more than limit/trailing fills (fast-move execution)
-        slip = STOP_SLIPPAGE_RATE if reason in ("stop_loss", "exchange_stop") else SLIPPAGE_RATE
-
-        # Apply slippage to exit
-        if position.side == "buy":
-            # Selling to close long — slippage pushes price down
-            adjusted_exit = exit_price * (1 - slip)
-        else:
-            # Buying to close short — slippage pushes price up
-            adjusted_exit = exit_price * (1 + slip)
-
-        # Calculate P&L
-        if position.side == "buy":
-            raw_pnl = (adjusted_exit - position.entry_price) * position.quantity
-        else:
-            raw_pnl = (position.entry_price - adjusted_exit) * position.quantity
-
-        # Fees: entry fee already deducted on open, now deduct exit fee
-        exit_fee = adjusted_exit * position.quantity * FEE_RATE
+        # Slippage-adjusted exit and P&L. Entry fee already deducted on open, so
+        # only the exit fee comes off here
+        if fill is None:
+            fill = self._close_fills([(position, exit_price, reason)])[0]
+        adjusted_exit, raw_pnl, exit_fee = fill
         net_pnl = raw_pnl - exit_fee
+        cost = position.cost  # entry notional: funding, margin and entry fee all derive from it
 
         # Funding cost: charged per 8h period held, on notional (live bleed -$9.12 not
         # previously modeled). Approximated from hold duration.
@@ -667,23 +1068,22 @@ class BacktestEngine:
             entry_t = getattr(position, "_entry_time", timestamp)
             hold_hours = max(0.0, (timestamp - entry_t).total_seconds() / 3600.0)
             funding_periods = hold_hours / 8.0
-            funding_cost = position.cost * FUNDING_RATE_PER_8H * funding_periods
+            funding_cost = cost * FUNDING_RATE_PER_8H * funding_periods
             net_pnl -= funding_cost
         except Exception:
             pass
 
         # Return margin + PnL to balance
-        leverage = getattr(settings, "LEVERAGE", 1)
-        margin = position.cost / leverage
+        margin = cost / self._leverage
         self.balance += margin + net_pnl
 
         # Entry fee was already included; total fees for the round trip
-        entry_fee = position.entry_price * position.quantity * FEE_RATE
+        entry_fee = cost * FEE_RATE
         total_fees = entry_fee + exit_fee
 
         pnl_pct = net_pnl / margin if margin > 0 else 0.0
 
-        trade = ClosedTrade(
+        self.closed_trades.append(
             symbol=symbol,
             side=position.side,
             strategy=position.strategy,
@@ -698,7 +1098,6 @@ class BacktestEngine:
             exit_reason=reason,
             confidence=position.confidence,
         )
-        self.closed_trades.append(trade)
 
         # Feed to adaptive tracker (skip end-of-backtest force-closes)
         if self.adaptive_tracker is not None and reason != "end_of_backtest":
@@ -719,31 +1118,39 @@ class BacktestEngine:
                 reward=reward,
             ))
 
-        logger.debug(
-            f"CLOSE {position.side.upper()} {symbol} @ {adjusted_exit:.4f} | "
-            f"PnL: ${net_pnl:.4f} ({pnl_pct:.2%}) | Reason: {reason}"
-        )
+        if self._debug:
+            logger.debug(
+                f"CLOSE {position.side.upper()} {symbol} @ {adjusted_exit:.4f} | "
+                f"PnL: ${net_pnl:.4f} ({pnl_pct:.2%}) | Reason: {reason}"
+            )
+
+    def _strategy_overrides(self, overrides, strategy: str) -> _StrategyOverrides:
+        """Per-strategy view of overrides, cached until the controller hands out a new object."""
+        source, by_strategy = self._override_cache
+        if source is not overrides:
+            by_strategy = {}
+            self._override_cache = (overrides, by_strategy)
+        strat = by_strategy.get(strategy)
+        if strat is None:
+            strat = by_strategy[strategy] = _StrategyOverrides(
+                enabled=overrides.strategy_enabled.get(strategy, True),
+                min_confidence=overrides.min_confidence.get(strategy, settings.MIN_SIGNAL_CONFIDENCE),
+                rr_ratio=overrides.rr_ratio.get(strategy, settings.REWARD_RISK_RATIO),
+                sl_atr_multiplier=overrides.sl_atr_multiplier.get(strategy, settings.STOP_LOSS_ATR_MULTIPLIER),
+                size_scale=overrides.position_size_scale.get(strategy, 1.0),
+            )
+        return strat
 
     def _analyze_and_trade(self, symbol: str, timestamp, bar_idx: int, portfolio_value: float):
         """Analyze a symbol and potentially open a new position."""
         # Dynamic risk checks: cooldown, frequency, post-profit, clustering
-        if self.risk_manager.check_cooldown(symbol, bar_idx):
-            return
-        if self.risk_manager.check_pair_streak_cooldown(symbol, bar_idx):
-            return
-        if self.risk_manager.check_trade_frequency(bar_idx):
-            return
-        if self.risk_manager.check_post_profit_cooldown(symbol, bar_idx):
-            return
-        if self.risk_manager.check_trade_clustering(bar_idx):
+        if self.risk_manager.check_entry_blocked(symbol, bar_idx):
             return
 
         # Get indicator window (last 200 bars)
         df = self._get_indicator_window(symbol, timestamp)
         # Need enough bars for the largest indicator (ADX needs ~2x period, S/R needs lookback)
-        min_bars = max(settings.ADX_PERIOD * 2, settings.EMA_TREND,
-                       getattr(settings, "SR_LOOKBACK", 50)) + 10
-        if df.empty or len(df) < min_bars:
+        if df.empty or len(df) < self._min_bars:
             return  # Not enough data for indicators
 
         # Get higher timeframe data for MTF filter
@@ -764,18 +1171,18 @@ class BacktestEngine:
         overrides = None
         if self.adaptive_controller is not None:
             overrides = self.adaptive_controller.compute_overrides()
+            strat = self._strategy_overrides(overrides, signal.strategy)
 
             # Check if strategy is disabled
-            if not overrides.strategy_enabled.get(signal.strategy, True):
+            if not strat.enabled:
                 return
 
         # Validate via risk manager (with adaptive confidence + R:R)
         if overrides is not None:
             # Use adaptive confidence threshold
-            adaptive_conf = overrides.min_confidence.get(signal.strategy, settings.MIN_SIGNAL_CONFIDENCE)
             if signal.signal == Signal.HOLD:
                 return
-            if signal.confidence < adaptive_conf:
+            if signal.confidence < strat.min_confidence:
                 return
             if signal.stop_loss <= 0:
                 return
@@ -783,15 +1190,13 @@ class BacktestEngine:
             # Use adaptive R:R ratio (per-strategy)
             risk = abs(signal.entry_price - signal.stop_loss)
             reward = abs(signal.take_profit - signal.entry_price)
-            strat_rr = overrides.rr_ratio.get(signal.strategy, settings.REWARD_RISK_RATIO)
+            strat_rr = strat.rr_ratio
             if risk > 0 and reward / risk < strat_rr - 0.01:
                 return
 
             # Rebuild SL/TP with adaptive ATR multiplier if different from strategy base
-            strat_sl = overrides.sl_atr_multiplier.get(signal.strategy, settings.STOP_LOSS_ATR_MULTIPLIER)
-            base_sl = getattr(settings, "STRATEGY_SL_ATR_MULTIPLIER", {}).get(
-                signal.strategy, settings.STOP_LOSS_ATR_MULTIPLIER
-            )
+            strat_sl = strat.sl_atr_multiplier
+            base_sl = self._sl_map.get(signal.strategy, settings.STOP_LOSS_ATR_MULTIPLIER)
             if abs(strat_sl - base_sl) > 0.01:
                 atr_scale = strat_sl / base_sl
                 new_risk = risk * atr_scale
@@ -803,13 +1208,11 @@ class BacktestEngine:
                     signal.take_profit = signal.entry_price - new_risk * strat_rr
 
             # Always enforce MIN_SL_DISTANCE_PCT — adaptive path skips validate_signal()
-            min_sl_pct = getattr(settings, "MIN_SL_DISTANCE_PCT", 0.015)
+            min_sl_pct = self._min_sl_pct
             sl_dist = abs(signal.entry_price - signal.stop_loss) / signal.entry_price
             if sl_dist < min_sl_pct:
                 min_sl_dist = signal.entry_price * min_sl_pct
-                strat_rr_adj = getattr(settings, "STRATEGY_REWARD_RISK_RATIO", {}).get(
-                    signal.strategy, settings.REWARD_RISK_RATIO
-                )
+                strat_rr_adj = self._rr_map.get(signal.strategy, settings.REWARD_RISK_RATIO)
                 if signal.signal == Signal.BUY:
                     signal.stop_loss = signal.entry_price - min_sl_dist
                     signal.take_profit = signal.entry_price + min_sl_dist * strat_rr_adj
@@ -835,9 +1238,7 @@ class BacktestEngine:
 
         # Apply adaptive scaling to quantity
         if overrides is not None:
-            size_scale = overrides.position_size_scale.get(signal.strategy, 1.0)
-            lev_scale = overrides.leverage_scale
-            quantity *= size_scale * lev_scale
+            quantity *= strat.size_scale * overrides.leverage_scale
             if quantity <= 0:
                 return
 
@@ -849,7 +1250,7 @@ class BacktestEngine:
 
         # Deduct entry fee and margin from balance
         entry_fee = adjusted_entry * quantity * FEE_RATE
-        leverage = getattr(settings, "LEVERAGE", 1)
+        leverage = self._leverage
         margin = (adjusted_entry * quantity) / leverage
 
         if margin + entry_fee > self.balance:
@@ -859,9 +1260,7 @@ class BacktestEngine:
 
         # Create position
         self.trade_counter += 1
-        sl_mult = getattr(settings, "STRATEGY_SL_ATR_MULTIPLIER", {}).get(
-            signal.strategy, settings.STOP_LOSS_ATR_MULTIPLIER
-        )
+        sl_mult = self._sl_map.get(signal.strategy, settings.STOP_LOSS_ATR_MULTIPLIER)
         position = Position(
             trade_id=self.trade_counter,
             symbol=symbol,
@@ -880,28 +1279,30 @@ class BacktestEngine:
         self.portfolio.add_position(position)
         self.risk_manager.record_trade_opened()
 
-        logger.debug(
-            f"OPEN {signal.signal.value} {symbol} @ {adjusted_entry:.4f} | "
-            f"Qty: {quantity:.6f} | SL: {signal.stop_loss:.4f} | TP: {signal.take_profit:.4f} | "
-            f"Strategy: {signal.strategy} | Conf: {signal.confidence:.2f}"
-        )
+        if self._debug:
+            logger.debug(
+                f"OPEN {signal.signal.value} {symbol} @ {adjusted_entry:.4f} | "
+                f"Qty: {quantity:.6f} | SL: {signal.stop_loss:.4f} | TP: {signal.take_profit:.4f} | "
+                f"Strategy: {signal.strategy} | Conf: {signal.confidence:.2f}"
+            )
 
     def _close_remaining(self, last_timestamp):
         """Close any positions still open at end of backtest."""
-        for symbol in list(self.portfolio.positions.keys()):
-            candle = self._get_candle(symbol, last_timestamp)
-            if candle is not None:
-                self._close_position(symbol, candle["close"], "end_of_backtest", last_timestamp)
+        closes = self._get_current_prices(last_timestamp)
+        for symbol in tuple(self.portfolio.positions):
+            if symbol in closes:
+                self._close_position(symbol, closes[symbol], "end_of_backtest", last_timestamp)
 
     def _build_result(self) -> BacktestResult:
         """Package results into a BacktestResult."""
         final_value = self.balance
-        if self.equity_curve:
-            final_value = self.equity_curve[-1]["equity"]
+        if len(self._equity_values):
+            final_value = float(self._equity_values[-1])
 
         return BacktestResult(
             trades=self.closed_trades,
-            equity_curve=self.equity_curve,
+            equity_curve=_equity_frame(self._equity_index, self._equity_values, self._position_counts),
+            adaptive_snapshots=self._adaptive_snapshots,
             initial_balance=self.initial_balance,
             final_balance=final_value,
             start_date=self.start_date,
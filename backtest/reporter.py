@@ -1,17 +1,18 @@
 """Backtest performance metrics and equity curve reporting."""
 
 import os
-from collections import defaultdict
 
 import numpy as np
 import pandas as pd
 
-from backtest.engine import BacktestResult, ClosedTrade
+from backtest._kernels import drawdown_kernel, streaks_kernel
+from backtest.engine import BacktestResult, TradeBuffer
 from utils.logger import setup_logger
 
 logger = setup_logger("backtest_reporter")
 
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+_MAX_TRADE_MARKERS = 5000
 
 
 class BacktestReporter:
@@ -21,17 +22,24 @@ class BacktestReporter:
         self.result = result
         self.trades = result.trades
         self.equity_curve = result.equity_curve
+        # Trade PnLs as one array; the win/loss aggregates are masked reductions over it
+        self._pnl = self._trade_column("pnl", np.float64)
+        self._wins = self._pnl > 0
+        self._streak_counts = None
+        self._equities = np.ascontiguousarray(self.equity_curve["equity"].to_numpy(dtype=np.float64))
+        # Curve span as datetime64; trades_per_day reads it without building Timestamps
+        stamps = self.equity_curve.index.to_numpy(dtype="datetime64[ns]")
+        self._span = stamps[-1] - stamps[0] if len(stamps) else np.timedelta64(0, "ns")
+
+    def _trade_column(self, name: str, dtype) -> np.ndarray:
+        if isinstance(self.trades, TradeBuffer):
+            return self.trades.column(name).astype(dtype, copy=False)
+        return np.array([getattr(t, name) for t in self.trades], dtype=dtype)
 
     # ------------------------------------------------------------------
     # Core metrics
     # ------------------------------------------------------------------
 
-    def _winning_trades(self) -> list[ClosedTrade]:
-        return [t for t in self.trades if t.pnl > 0]
-
-    def _losing_trades(self) -> list[ClosedTrade]:
-        return [t for t in self.trades if t.pnl <= 0]
-
     def total_return_pct(self) -> float:
         if self.result.initial_balance == 0:
             return 0.0
@@ -43,11 +51,11 @@ class BacktestReporter:
     def win_rate(self) -> float:
         if not self.trades:
             return 0.0
-        return len(self._winning_trades()) / len(self.trades)
+        return int(self._wins.sum()) / len(self.trades)
 
     def profit_factor(self) -> float:
-        gross_profit = sum(t.pnl for t in self._winning_trades())
-        gross_loss = abs(sum(t.pnl for t in self._losing_trades()))
+        gross_profit = float(self._pnl[self._wins].sum())
+        gross_loss = abs(float(self._pnl[~self._wins].sum()))
         if gross_loss == 0:
             return float("inf") if gross_profit > 0 else 0.0
         return gross_profit / gross_loss
@@ -55,15 +63,15 @@ class BacktestReporter:
     def expectancy(self) -> float:
         if not self.trades:
             return 0.0
-        return sum(t.pnl for t in self.trades) / len(self.trades)
+        return float(self._pnl.sum()) / len(self.trades)
 
     def avg_win(self) -> float:
-        wins = self._winning_trades()
-        return sum(t.pnl for t in wins) / len(wins) if wins else 0.0
+        wins = self._pnl[self._wins]
+        return float(wins.mean()) if len(wins) else 0.0
 
     def avg_loss(self) -> float:
-        losses = self._losing_trades()
-        return sum(t.pnl for t in losses) / len(losses) if losses else 0.0
+        losses = self._pnl[~self._wins]
+        return float(losses.mean()) if len(losses) else 0.0
 
     def reward_risk_achieved(self) -> float:
         avg_l = abs(self.avg_loss())
@@ -72,50 +80,30 @@ class BacktestReporter:
         return self.avg_win() / avg_l
 
     def total_fees(self) -> float:
-        return sum(t.fees for t in self.trades)
+        return sum(self._trade_column("fees", np.float64).tolist())
 
     def max_drawdown(self) -> tuple[float, int]:
         """Returns (max_drawdown_pct, duration_in_bars)."""
-        if not self.equity_curve:
+        if self.equity_curve.empty:
             return 0.0, 0
 
-        equities = [e["equity"] for e in self.equity_curve]
-        peak = equities[0]
-        max_dd = 0.0
-        dd_start = 0
-        max_dd_duration = 0
-        current_dd_start = 0
-
-        for i, eq in enumerate(equities):
-            if eq > peak:
-                # New peak — record duration of previous drawdown
-                duration = i - current_dd_start
-                if duration > max_dd_duration and max_dd > 0:
-                    max_dd_duration = duration
-                peak = eq
-                current_dd_start = i
-            else:
-                dd = (peak - eq) / peak
-                if dd > max_dd:
-                    max_dd = dd
-                    dd_start = current_dd_start
-
-        # If still in drawdown at end
-        duration = len(equities) - current_dd_start
-        if duration > max_dd_duration and max_dd > 0:
-            max_dd_duration = duration
-
-        return max_dd, max_dd_duration
+        max_dd, max_dd_duration = drawdown_kernel(self._equities)
+        return float(max_dd), int(max_dd_duration)
 
     def sharpe_ratio(self) -> float:
         """Annualized Sharpe ratio from equity returns."""
         if len(self.equity_curve) < 2:
             return 0.0
 
-        equities = pd.Series([e["equity"] for e in self.equity_curve])
-        returns = equities.pct_change().dropna()
+        # Same arithmetic as Series.pct_change(): next / previous - 1
+        equities = self._equities
+        returns = equities[1:] / equities[:-1] - 1.0
+        returns = returns[~np.isnan(returns)]
+        if returns.size < 2:
+            return 0.0
+        std = returns.std(ddof=1)
 
-        if returns.std() == 0:
+        if std == 0:
             return 0.0
 
         from config import settings
@@ -123,35 +111,29 @@ class BacktestReporter:
         tf_minutes = {"1m": 1, "3m": 3, "5m": 5, "15m": 15, "30m": 30, "1h": 60}.get(tf, 15)
         bars_per_year = int((60 / tf_minutes) * 24 * 365)
         annualized_return = returns.mean() * bars_per_year
-        annualized_vol = returns.std() * np.sqrt(bars_per_year)
+        annualized_vol = std * np.sqrt(bars_per_year)
 
         return annualized_return / annualized_vol
 
     def max_consecutive_wins(self) -> int:
-        return self._max_consecutive(win=True)
+        return self._streaks()[0]
 
     def max_consecutive_losses(self) -> int:
-        return self._max_consecutive(win=False)
-
-    def _max_consecutive(self, win: bool) -> int:
-        max_streak = 0
-        current = 0
-        for t in self.trades:
-            if (t.pnl > 0) == win:
-                current += 1
-                max_streak = max(max_streak, current)
-            else:
-                current = 0
-        return max_streak
+        return self._streaks()[1]
+
+    def _streaks(self) -> tuple[int, int]:
+        """(max consecutive wins, max consecutive losses), from one pass over the PnLs."""
+        if self._streak_counts is None:
+            wins, losses = streaks_kernel(self._pnl)
+            self._streak_counts = (int(wins), int(losses))
+        return self._streak_counts
 
     def trades_per_day(self) -> float:
         if not self.trades:
             return 0.0
-        if not self.equity_curve:
+        if self.equity_curve.empty:
             return 0.0
-        first_ts = self.equity_curve[0]["timestamp"]
-        last_ts = self.equity_curve[-1]["timestamp"]
-        days = (pd.Timestamp(last_ts) - pd.Timestamp(first_ts)).total_seconds() / 86400
+        days = float(self._span / np.timedelta64(1, "s")) / 86400
         if days <= 0:
             return 0.0
         return len(self.trades) / days
@@ -162,37 +144,29 @@ class BacktestReporter:
 
     def per_strategy_breakdown(self) -> dict:
         """Returns {strategy_name: {trades, wins, win_rate, avg_pnl, total_pnl}}."""
-        by_strat = defaultdict(list)
-        for t in self.trades:
-            by_strat[t.strategy].append(t)
-
-        result = {}
-        for strat, trades in sorted(by_strat.items()):
-            wins = [t for t in trades if t.pnl > 0]
-            result[strat] = {
-                "trades": len(trades),
-                "wins": len(wins),
-                "win_rate": len(wins) / len(trades) if trades else 0,
-                "avg_pnl": sum(t.pnl for t in trades) / len(trades),
-                "total_pnl": sum(t.pnl for t in trades),
-            }
-        return result
+        return self._breakdown("strategy")
 
     def per_symbol_breakdown(self) -> dict:
         """Returns {symbol: {trades, wins, win_rate, avg_pnl, total_pnl}}."""
-        by_sym = defaultdict(list)
-        for t in self.trades:
-            by_sym[t.symbol].append(t)
+        return self._breakdown("symbol")
+
+    def _breakdown(self, field: str) -> dict:
+        # Label-encode the keys (sorted), then one bincount per aggregate. Weighted
+        # bincount adds in trade order, so totals match a running sum exactly
+        ids, keys = pd.factorize(self._trade_column(field, object), sort=True)
+        n_keys = len(keys)
+        counts = np.bincount(ids, minlength=n_keys).tolist()
+        wins = np.bincount(ids[self._wins], minlength=n_keys).tolist()
+        totals = np.bincount(ids, weights=self._pnl, minlength=n_keys).tolist()
 
         result = {}
-        for sym, trades in sorted(by_sym.items()):
-            wins = [t for t in trades if t.pnl > 0]
-            result[sym] = {
-                "trades": len(trades),
-                "wins": len(wins),
-                "win_rate": len(wins) / len(trades) if trades else 0,
-                "avg_pnl": sum(t.pnl for t in trades) / len(trades),
-                "total_pnl": sum(t.pnl for t in trades),
+        for key, n, w, total in zip(keys, counts, wins, totals):
+            result[key] = {
+                "trades": n,
+                "wins": w,
+                "win_rate": w / n,
+                "avg_pnl": total / n,
+                "total_pnl": total,
             }
         return result
 
@@ -220,7 +194,7 @@ class BacktestReporter:
         print("-" * 70)
         print(f"  Total Return:        {self.total_return_pct():+.2%}  (${self.total_pnl():+.4f})")
         print(f"  Total Trades:        {len(self.trades)}")
-        print(f"  Win Rate:            {self.win_rate():.1%}  ({len(self._winning_trades())}W / {len(self._losing_trades())}L)")
+        print(f"  Win Rate:            {self.win_rate():.1%}  ({int(self._wins.sum())}W / {int((~self._wins).sum())}L)")
         print(f"  Profit Factor:       {self.profit_factor():.2f}")
         print(f"  Expectancy:          ${self.expectancy():.4f} per trade")
         print(f"  Avg Win:             ${self.avg_win():.4f}")
@@ -233,39 +207,9 @@ class BacktestReporter:
         print(f"  Trades/Day:          {self.trades_per_day():.2f}")
         print(f"  Total Fees:          ${self.total_fees():.4f}")
 
-        # -- Per-strategy breakdown --
-        strat_data = self.per_strategy_breakdown()
-        if strat_data:
-            print()
-            print("-" * 70)
-            print("  PER-STRATEGY BREAKDOWN")
-            print("-" * 70)
-            print(f"  {'Strategy':<20} {'Trades':>6} {'WinRate':>8} {'AvgPnL':>10} {'TotalPnL':>10}")
-            print(f"  {'-'*20} {'-'*6} {'-'*8} {'-'*10} {'-'*10}")
-            for strat, m in strat_data.items():
-                print(
-                    f"  {strat:<20} {m['trades']:>6} "
-                    f"{m['win_rate']:>7.1%} "
-                    f"${m['avg_pnl']:>9.4f} "
-                    f"${m['total_pnl']:>9.4f}"
-                )
-
-        # -- Per-symbol breakdown --
-        sym_data = self.per_symbol_breakdown()
-        if sym_data:
-            print()
-            print("-" * 70)
-            print("  PER-SYMBOL BREAKDOWN")
-            print("-" * 70)
-            print(f"  {'Symbol':<20} {'Trades':>6} {'WinRate':>8} {'AvgPnL':>10} {'TotalPnL':>10}")
-            print(f"  {'-'*20} {'-'*6} {'-'*8} {'-'*10} {'-'*10}")
-            for sym, m in sym_data.items():
-                print(
-                    f"  {sym:<20} {m['trades']:>6} "
-                    f"{m['win_rate']:>7.1%} "
-                    f"${m['avg_pnl']:>9.4f} "
-                    f"${m['total_pnl']:>9.4f}"
-                )
+        # -- Per-strategy / per-symbol breakdowns --
+        self._print_breakdown("PER-STRATEGY BREAKDOWN", "Strategy", self.per_strategy_breakdown())
+        self._print_breakdown("PER-SYMBOL BREAKDOWN", "Symbol", self.per_symbol_breakdown())
 
         # -- Last 10 trades --
         if self.trades:
@@ -273,15 +217,19 @@ class BacktestReporter:
             print("-" * 70)
             print("  RECENT TRADES (last 10)")
             print("-" * 70)
-            print(f"  {'Time':<20} {'Symbol':<12} {'Side':<5} {'Entry':>9} {'Exit':>9} {'PnL':>10} {'Reason':<12}")
-            print(f"  {'-'*20} {'-'*12} {'-'*5} {'-'*9} {'-'*9} {'-'*10} {'-'*12}")
-            for t in self.trades[-10:]:
-                exit_time = pd.Timestamp(t.exit_time).strftime("%Y-%m-%d %H:%M")
-                print(
-                    f"  {exit_time:<20} {t.symbol:<12} {t.side:<5} "
-                    f"{t.entry_price:>9.4f} {t.exit_price:>9.4f} "
-                    f"${t.pnl:>+9.4f} {t.exit_reason:<12}"
-                )
+            recent = self.trades[-10:]
+            exit_times = pd.DatetimeIndex([t.exit_time for t in recent]).strftime("%Y-%m-%d %H:%M")
+            lines = [
+                f"  {'Time':<20} {'Symbol':<12} {'Side':<5} {'Entry':>9} {'Exit':>9} {'PnL':>10} {'Reason':<12}",
+                f"  {'-'*20} {'-'*12} {'-'*5} {'-'*9} {'-'*9} {'-'*10} {'-'*12}",
+            ]
+            lines += [
+                f"  {exit_time:<20} {t.symbol:<12} {t.side:<5} "
+                f"{t.entry_price:>9.4f} {t.exit_price:>9.4f} "
+                f"${t.pnl:>+9.4f} {t.exit_reason:<12}"
+                for exit_time, t in zip(exit_times, recent)
+            ]
+            print("\n".join(lines))
 
         # -- Pair rotation summary --
         self._print_pair_rotation_summary()
@@ -292,6 +240,28 @@ class BacktestReporter:
         print()
         print("=" * 70)
 
+    @staticmethod
+    def _print_breakdown(title: str, label: str, data: dict):
+        """One breakdown table (per strategy or per symbol), written in a single print."""
+        if not data:
+            return
+        lines = [
+            "",
+            "-" * 70,
+            f"  {title}",
+            "-" * 70,
+            f"  {label:<20} {'Trades':>6} {'WinRate':>8} {'AvgPnL':>10} {'TotalPnL':>10}",
+            f"  {'-'*20} {'-'*6} {'-'*8} {'-'*10} {'-'*10}",
+        ]
+        lines += [
+            f"  {key:<20} {m['trades']:>6} "
+            f"{m['win_rate']:>7.1%} "
+            f"${m['avg_pnl']:>9.4f} "
+            f"${m['total_pnl']:>9.4f}"
+            for key, m in data.items()
+        ]
+        print("\n".join(lines))
+
     def _print_pair_rotation_summary(self):
         """Print pair rotation analysis if dynamic pairs were used."""
         rotations = getattr(self.result, "pair_rotations", [])
@@ -361,8 +331,8 @@ class BacktestReporter:
         print(f"  Overall:  WR={overall.win_rate:.0%}  PF={overall.profit_factor:.2f}  "
               f"Trades={overall.trade_count}  Trend={overall.recent_trend:+.2f}")
 
-        # Show adaptation timeline from equity curve snapshots
-        adaptive_snapshots = [e for e in self.equity_curve if "adaptive" in e]
+        # Show adaptation timeline from the periodic snapshots
+        adaptive_snapshots = self.result.adaptive_snapshots
         if adaptive_snapshots:
             print()
             print(f"  Adaptation Timeline (sampled every ~24h):")
@@ -390,7 +360,7 @@ class BacktestReporter:
 
     def plot_equity_curve(self, save_path: str | None = None):
         """Save equity curve as a PNG image."""
-        if not self.equity_curve:
+        if self.equity_curve.empty:
             print("  No equity data to plot.")
             return
 
@@ -409,26 +379,26 @@ class BacktestReporter:
 
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
 
-        timestamps = [e["timestamp"] for e in self.equity_curve]
-        equities = [e["equity"] for e in self.equity_curve]
+        timestamps = self.equity_curve.index
+        equities = self.equity_curve["equity"].to_numpy()
 
         fig, ax = plt.subplots(figsize=(14, 6))
         ax.plot(timestamps, equities, linewidth=1.0, color="#2196F3")
         ax.axhline(y=self.result.initial_balance, color="gray", linestyle="--",
                     linewidth=0.8, label=f"Start ${self.result.initial_balance:.2f}")
         ax.fill_between(timestamps, equities, self.result.initial_balance,
-                         where=[e >= self.result.initial_balance for e in equities],
+                         where=equities >= self.result.initial_balance,
                          alpha=0.15, color="green")
         ax.fill_between(timestamps, equities, self.result.initial_balance,
-                         where=[e < self.result.initial_balance for e in equities],
+                         where=equities < self.result.initial_balance,
                          alpha=0.15, color="red")
 
-        # Mark trades
-        for t in self.trades:
-            color = "green" if t.pnl > 0 else "red"
-            marker = "^" if t.side == "buy" else "v"
-            # Find closest equity timestamp to exit time
-            ax.axvline(x=t.exit_time, color=color, alpha=0.1, linewidth=0.5)
+        # Mark trade exits as one full-height line collection, green for wins and
+        # red otherwise; past _MAX_TRADE_MARKERS the lines only blur together
+        if 0 < len(self.trades) <= _MAX_TRADE_MARKERS:
+            ax.vlines(self._trade_column("exit_time", "datetime64[ns]"), 0, 1,
+                      transform=ax.get_xaxis_transform(),
+                      colors=np.where(self._wins, "green", "red"), alpha=0.1, linewidth=0.5)
 
         ax.set_title(
             f"Backtest Equity Curve | {self.result.start_date} -> {self.result.end_date} | "
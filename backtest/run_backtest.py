@@ -3,18 +3,28 @@
 Usage:
     python -m backtest.run_backtest --start 2025-11-01 --end 2026-02-01 --balance 100
     python -m backtest.run_backtest --start 2025-06-01 --end 2026-02-01 --walk-forward
+    python -m backtest.run_backtest --start 2025-11-01 --end 2026-02-01 --parallel 4
 """
 
 import argparse
+import heapq
 import logging
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
 
 # Ensure project root is on sys.path so imports work
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backtest.engine import BacktestEngine
+import numpy as np
+import pandas as pd
+
+from backtest._kernels import warm_up
+from backtest.engine import BacktestEngine, BacktestResult, TradeBuffer
 from backtest.reporter import BacktestReporter
+from config import settings
+from utils.pool import FORK_CONTEXT
 
 
 def _quiet_loggers():
@@ -27,6 +37,71 @@ def _quiet_loggers():
             handler.setLevel(logging.CRITICAL)
 
 
+def _run_isolated(symbol: str, start: str, end: str, balance: float, adaptive: bool) -> BacktestResult:
+    """Backtest one symbol on its own balance (runs in a worker process)."""
+    _quiet_loggers()
+    engine = BacktestEngine(
+        symbols=[symbol], start_date=start, end_date=end,
+        initial_balance=balance, adaptive=adaptive,
+    )
+    result = engine.run()
+    result.adaptive_controller = None  # per-slice state; not sent back to the parent
+    return result
+
+
+def _merge_results(results: list[BacktestResult], start: str, end: str) -> BacktestResult:
+    """Combine isolated per-symbol runs into one portfolio-level result."""
+    trades = TradeBuffer()
+    for trade in sorted((t for r in results for t in r.trades), key=lambda t: t.exit_time):
+        trades.append(**asdict(trade))
+
+    # Each slice holds its starting balance until its first bar, then its last value
+    index = results[0].equity_curve.index
+    for r in results[1:]:
+        index = index.union(r.equity_curve.index)
+    equity = sum(
+        r.equity_curve["equity"].reindex(index).ffill().fillna(r.initial_balance).to_numpy()
+        for r in results
+    )
+    positions = sum(
+        r.equity_curve["positions"].reindex(index).ffill().fillna(0).to_numpy()
+        for r in results
+    )
+    equity_curve = pd.DataFrame(
+        {"equity": equity, "positions": positions.astype(np.int32)}, index=index,
+    )
+
+    snapshots = heapq.merge(*(r.adaptive_snapshots for r in results), key=lambda s: s["timestamp"])
+    return BacktestResult(
+        trades=trades,
+        equity_curve=equity_curve,
+        adaptive_snapshots=list(snapshots),
+        initial_balance=sum(r.initial_balance for r in results),
+        final_balance=sum(r.final_balance for r in results),
+        start_date=start,
+        end_date=end,
+        symbols=[s for r in results for s in r.symbols],
+    )
+
+
+def _run_parallel(args) -> BacktestResult:
+    """Per-symbol isolated backtests across a process pool, merged post-hoc.
+
+    Each symbol trades 1/N of the balance with no shared portfolio, so
+    correlation caps and shared sizing are not modelled in this mode.
+    """
+    symbols = list(settings.DEFAULT_PAIRS)
+    balance = args.balance / len(symbols)
+    warm_up()
+    with ProcessPoolExecutor(max_workers=min(args.parallel, len(symbols)), mp_context=FORK_CONTEXT) as pool:
+        futures = [
+            pool.submit(_run_isolated, symbol, args.start, args.end, balance, args.adaptive)
+            for symbol in symbols
+        ]
+        results = [f.result() for f in futures]
+    return _merge_results(results, args.start, args.end)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="CryptoTrader Backtesting Engine",
@@ -36,6 +111,7 @@ Examples:
   python -m backtest.run_backtest --start 2025-11-01 --end 2026-02-01
   python -m backtest.run_backtest --start 2025-06-01 --end 2026-02-01 --balance 100
   python -m backtest.run_backtest --start 2025-06-01 --end 2026-02-01 --walk-forward
+  python -m backtest.run_backtest --start 2025-11-01 --end 2026-02-01 --parallel 4
         """,
     )
     parser.add_argument(
@@ -66,7 +142,14 @@ Examples:
         "--adaptive", action="store_true",
         help="Enable adaptive regime system (adjusts confidence, sizing, leverage, SL/TP)",
     )
+    parser.add_argument(
+        "--parallel", type=int, default=0, metavar="N",
+        help="Backtest each DEFAULT_PAIRS symbol in isolation, on an equal share of the balance, across N processes",
+    )
     args = parser.parse_args()
+    if args.parallel and (args.walk_forward or args.dynamic_pairs or args.smart_rotation):
+        parser.error("--parallel runs a fixed symbol list; it cannot be combined with "
+                     "--walk-forward, --dynamic-pairs or --smart-rotation")
 
     print()
     print("=" * 60)
@@ -82,6 +165,8 @@ Examples:
         print("  Mode:    Smart Pair Rotation (hysteresis)")
     if args.adaptive:
         print("  Mode:    Adaptive Regime System")
+    if args.parallel:
+        print(f"  Mode:    Per-Symbol Isolated ({args.parallel} processes)")
     print()
 
     _quiet_loggers()
@@ -95,6 +180,14 @@ Examples:
             initial_balance=args.balance,
         )
         wf.run()
+    elif args.parallel:
+        print("[1/2] Running per-symbol simulations...")
+        result = _run_parallel(args)
+
+        print("\n[2/2] Generating report...")
+        reporter = BacktestReporter(result)
+        reporter.print_report()
+        reporter.plot_equity_curve()
     else:
         # Apply smart rotation flag before engine init
         if args.smart_rotation:
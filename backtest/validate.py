@@ -35,6 +35,7 @@ logging.disable(logging.INFO)
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import numpy as np
 from dateutil.relativedelta import relativedelta
 from datetime import datetime
 
@@ -64,25 +65,23 @@ def run_window(start: str, end: str, balance: float = 100.0) -> WindowStat:
         eng = BacktestEngine(start_date=start, end_date=end,
                              initial_balance=balance, adaptive=True)
         result = eng.run()
-        trades = result.trades
-        n = len(trades)
-        wins = [t for t in trades if t.pnl > 0]
-        losses = [t for t in trades if t.pnl < 0]
-        gross_w = sum(t.pnl for t in wins)
-        gross_l = sum(t.pnl for t in losses)
-        pnl = sum(t.pnl for t in trades)
+        pnls = result.trades.column("pnl")
+        n = len(pnls)
+        wins = pnls[pnls > 0]
+        losses = pnls[pnls < 0]
+        gross_w = sum(wins.tolist())
+        gross_l = sum(losses.tolist())
+        pnl = sum(pnls.tolist())
         pf = abs(gross_w / gross_l) if gross_l else float("inf") if gross_w else 0.0
-        wr = len(wins) / (len(wins) + len(losses)) if (wins or losses) else 0.0
-        # max drawdown from equity curve (list of dicts with "equity")
-        eq_raw = getattr(result, "equity_curve", None) or []
-        eq = [pt["equity"] if isinstance(pt, dict) else pt for pt in eq_raw]
+        wr = len(wins) / (len(wins) + len(losses)) if (len(wins) or len(losses)) else 0.0
+        # max drawdown from the equity column, against the running peak
+        eq = result.equity_curve["equity"].to_numpy(dtype=np.float64)
         mdd = 0.0
-        if eq:
-            peak = eq[0]
-            for v in eq:
-                peak = max(peak, v)
-                if peak > 0:
-                    mdd = max(mdd, (peak - v) / peak)
+        if len(eq):
+            peaks = np.maximum.accumulate(eq)
+            above = peaks > 0
+            if above.any():
+                mdd = max(mdd, float(((peaks[above] - eq[above]) / peaks[above]).max()))
         return WindowStat(
             start=start, end=end, trades=n, wins=len(wins), losses=len(losses),
             win_rate=wr, pnl=pnl, ev_per_trade=(pnl / n if n else 0.0),
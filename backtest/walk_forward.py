@@ -10,13 +10,22 @@ Usage:
     wf.run()
 """
 
+import os
+from calendar import monthrange
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 
-from dateutil.relativedelta import relativedelta
+import numpy as np
+import pandas as pd
 
-from backtest.engine import BacktestEngine
+from backtest._kernels import warm_up
+from backtest.data_loader import DataLoader, to_epoch_ms
+from backtest.engine import BacktestEngine, data_requests
 from backtest.reporter import BacktestReporter
+from config import settings
+from utils.pool import FORK_CONTEXT
 
 
 @dataclass
@@ -38,6 +47,62 @@ class WalkForwardResult:
     windows: list[tuple[WindowResult, WindowResult]] = field(default_factory=list)
 
 
+# (symbol, timeframe) -> candles for the whole walk-forward range, set by
+# WalkForwardEngine.run(). Forked workers inherit it without pickling; under
+# spawn it is None there and windows read the disk cache the prefetch filled
+_SHARED_OHLCV: dict[tuple[str, str], pd.DataFrame] | None = None
+
+
+def _run_window(start: str, end: str, balance: float) -> WindowResult:
+    """Run a single backtest window and extract key metrics (module-level so worker processes can unpickle it)."""
+    engine = BacktestEngine(
+        start_date=start,
+        end_date=end,
+        initial_balance=balance,
+        ohlcv=_SHARED_OHLCV,
+    )
+    result = engine.run()
+    reporter = BacktestReporter(result)
+
+    dd_pct, _ = reporter.max_drawdown()
+
+    return WindowResult(
+        start=start,
+        end=end,
+        total_return_pct=reporter.total_return_pct(),
+        trades=len(result.trades),
+        win_rate=reporter.win_rate(),
+        max_drawdown_pct=dd_pct,
+        profit_factor=reporter.profit_factor(),
+        final_balance=result.final_balance,
+    )
+
+
+def _add_months(date: tuple[int, int, int], months: int) -> tuple[int, int, int]:
+    """(y, m, d) + months, clamping the day to the month's length (as relativedelta does)."""
+    y, m, d = date
+    y, m = divmod(y * 12 + m - 1 + months, 12)
+    return y, m + 1, min(d, monthrange(y, m + 1)[1])
+
+
+@lru_cache(maxsize=8)
+def _month_windows(
+    start: tuple[int, int, int], end: tuple[int, int, int],
+    train_months: int, test_months: int, step_months: int,
+) -> tuple[tuple[str, str, str, str], ...]:
+    """(train_start, train_end, test_start, test_end) "YYYY-MM-DD" strings for each window."""
+    windows = []
+    cursor = start
+    while True:
+        train_end = _add_months(cursor, train_months)
+        test_end = _add_months(train_end, test_months)
+        if test_end > end:
+            break
+        windows.append(tuple(f"{y:04d}-{m:02d}-{d:02d}" for y, m, d in (cursor, train_end, train_end, test_end)))
+        cursor = _add_months(cursor, step_months)
+    return tuple(windows)
+
+
 class WalkForwardEngine:
     """Rolling-window walk-forward validation.
 
@@ -49,6 +114,10 @@ class WalkForwardEngine:
     test_months : int     Length of each testing window in months.
     step_months : int     How far to slide the window each iteration.
     initial_balance : float
+    parallel : bool       Run the windows' backtests across a process pool
+                          (False keeps everything in-process for debugging).
+    keep_results : bool   Collect every window into the returned result; with
+                          False only the printed table is produced.
     """
 
     def __init__(
@@ -59,6 +128,8 @@ class WalkForwardEngine:
         test_months: int = 1,
         step_months: int = 1,
         initial_balance: float = 100.0,
+        parallel: bool = True,
+        keep_results: bool = True,
     ):
         self.start = datetime.strptime(start, "%Y-%m-%d")
         self.end = datetime.strptime(end, "%Y-%m-%d")
@@ -66,57 +137,31 @@ class WalkForwardEngine:
         self.test_months = test_months
         self.step_months = step_months
         self.initial_balance = initial_balance
+        self.parallel = parallel
+        self.keep_results = keep_results
+        # (start, end, balance) -> WindowResult for ranges this engine already ran
+        self._window_cache: dict[tuple[str, str, float], WindowResult] = {}
 
     def _generate_windows(self) -> list[tuple[str, str, str, str]]:
         """Generate (train_start, train_end, test_start, test_end) tuples."""
-        windows = []
-        cursor = self.start
-
-        while True:
-            train_start = cursor
-            train_end = cursor + relativedelta(months=self.train_months)
-            test_start = train_end
-            test_end = test_start + relativedelta(months=self.test_months)
-
-            if test_end > self.end:
-                break
-
-            windows.append((
-                train_start.strftime("%Y-%m-%d"),
-                train_end.strftime("%Y-%m-%d"),
-                test_start.strftime("%Y-%m-%d"),
-                test_end.strftime("%Y-%m-%d"),
-            ))
-            cursor += relativedelta(months=self.step_months)
-
-        return windows
-
-    @staticmethod
-    def _run_window(start: str, end: str, balance: float) -> WindowResult:
-        """Run a single backtest window and extract key metrics."""
-        engine = BacktestEngine(
-            start_date=start,
-            end_date=end,
-            initial_balance=balance,
-        )
-        result = engine.run()
-        reporter = BacktestReporter(result)
-
-        dd_pct, _ = reporter.max_drawdown()
-
-        return WindowResult(
-            start=start,
-            end=end,
-            total_return_pct=reporter.total_return_pct(),
-            trades=len(result.trades),
-            win_rate=reporter.win_rate(),
-            max_drawdown_pct=dd_pct,
-            profit_factor=reporter.profit_factor(),
-            final_balance=result.final_balance,
+        return list(_month_windows(
+            (self.start.year, self.start.month, self.start.day),
+            (self.end.year, self.end.month, self.end.day),
+            self.train_months, self.test_months, self.step_months,
+        ))
+
+    def _prefetch_data(self) -> dict[tuple[str, str], pd.DataFrame]:
+        """Load (downloading once if needed) every series for the full range; windows slice it."""
+        requests = data_requests(
+            list(settings.DEFAULT_PAIRS),
+            to_epoch_ms(self.start.strftime("%Y-%m-%d")),
+            to_epoch_ms(self.end.strftime("%Y-%m-%d")),
         )
+        frames = DataLoader().load_many(requests)
+        return {(req.symbol, req.timeframe): df for req, df in zip(requests, frames)}
 
     def run(self) -> WalkForwardResult:
-        """Execute walk-forward analysis and print comparison table."""
+        """Execute walk-forward analysis, printing each comparison row as its window finishes."""
         windows = self._generate_windows()
         if not windows:
             print("Not enough date range for walk-forward windows.")
@@ -127,62 +172,97 @@ class WalkForwardEngine:
         print()
 
         wf_result = WalkForwardResult()
-
-        for i, (tr_s, tr_e, te_s, te_e) in enumerate(windows, 1):
-            print(f"--- Window {i}/{len(windows)} ---")
-            print(f"  Train: {tr_s} -> {tr_e}")
-            train_res = self._run_window(tr_s, tr_e, self.initial_balance)
-
-            print(f"  Test:  {te_s} -> {te_e}")
-            test_res = self._run_window(te_s, te_e, self.initial_balance)
-
-            wf_result.windows.append((train_res, test_res))
-            print()
-
-        # Print comparison table
-        self._print_table(wf_result)
-
+        # Per-window returns, filled as rows stream in, for the footer statistics
+        train_returns = np.empty(len(windows))
+        test_returns = np.empty(len(windows))
+
+        global _SHARED_OHLCV
+        print("Loading data for the full range...")
+        _SHARED_OHLCV = self._prefetch_data()
+        try:
+            self._print_header()
+            for i, (train_res, test_res) in enumerate(self._run_windows(windows)):
+                train_returns[i] = train_res.total_return_pct
+                test_returns[i] = test_res.total_return_pct
+                self._print_row(i + 1, train_res, test_res)
+                if self.keep_results:
+                    wf_result.windows.append((train_res, test_res))
+        finally:
+            _SHARED_OHLCV = None
+
+        self._print_footer(train_returns, test_returns)
         return wf_result
 
+    def _run_windows(self, windows: list[tuple[str, str, str, str]]):
+        """Yield (train, test) results in window order, computed in-process or across a pool."""
+        # Every train/test backtest is independent (own dates, fresh engine) and
+        # deterministic, so a range already simulated (e.g. test_i == train_i+1
+        # when train and test spans are equal) is served from _window_cache
+        cache = self._window_cache
+        keys = [(start, end, self.initial_balance)
+                for tr_s, tr_e, te_s, te_e in windows
+                for start, end in ((tr_s, tr_e), (te_s, te_e))]
+        pending = [key for key in dict.fromkeys(keys) if key not in cache]
+        workers = min(len(pending), os.cpu_count() or 1) if self.parallel else 1
+
+        if workers <= 1:
+            for i, (train_key, test_key) in enumerate(zip(keys[::2], keys[1::2]), 1):
+                print(f"--- Window {i}/{len(windows)} ---")
+                for label, key in (("Train:", train_key), ("Test: ", test_key)):
+                    if key in cache:
+                        print(f"  {label} {key[0]} -> {key[1]} (cached)")
+                    else:
+                        print(f"  {label} {key[0]} -> {key[1]}")
+                        cache[key] = _run_window(*key)
+                print()
+                yield cache[train_key], cache[test_key]
+        else:
+            print(f"Running {len(pending)} backtests across {workers} processes...")
+            warm_up()
+            with ProcessPoolExecutor(max_workers=workers, mp_context=FORK_CONTEXT) as pool:
+                # map() yields in submission order; pull results until each pair is resolved
+                results = zip(pending, pool.map(_run_window, *zip(*pending)))
+                for train_key, test_key in zip(keys[::2], keys[1::2]):
+                    while train_key not in cache or test_key not in cache:
+                        key, res = next(results)
+                        cache[key] = res
+                    yield cache[train_key], cache[test_key]
+
     @staticmethod
-    def _print_table(wf_result: WalkForwardResult):
-        """Print a per-window comparison table."""
+    def _print_header():
         print("=" * 90)
         print("  WALK-FORWARD COMPARISON")
         print("=" * 90)
-        header = (
+        print(
             f"  {'Window':<8} {'Period':<24} {'Return':>8} {'Trades':>7} "
             f"{'WinRate':>8} {'MaxDD':>8} {'PF':>6}"
         )
-        print(header)
         print(f"  {'-'*8} {'-'*24} {'-'*8} {'-'*7} {'-'*8} {'-'*8} {'-'*6}")
 
-        for i, (train, test) in enumerate(wf_result.windows, 1):
-            # Train row
-            print(
-                f"  {'T' + str(i):<8} {train.start + ' -> ' + train.end:<24} "
-                f"{train.total_return_pct:>+7.2%} {train.trades:>7} "
-                f"{train.win_rate:>7.1%} {train.max_drawdown_pct:>7.2%} "
-                f"{train.profit_factor:>6.2f}"
-            )
-            # Test row
+    @staticmethod
+    def _print_row(i: int, train: WindowResult, test: WindowResult):
+        """Train (T) and test (V) rows for window i."""
+        for tag, res in (("T", train), ("V", test)):
             print(
-                f"  {'V' + str(i):<8} {test.start + ' -> ' + test.end:<24} "
-                f"{test.total_return_pct:>+7.2%} {test.trades:>7} "
-                f"{test.win_rate:>7.1%} {test.max_drawdown_pct:>7.2%} "
-                f"{test.profit_factor:>6.2f}"
+                f"  {tag + str(i):<8} {res.start + ' -> ' + res.end:<24} "
+                f"{res.total_return_pct:>+7.2%} {res.trades:>7} "
+                f"{res.win_rate:>7.1%} {res.max_drawdown_pct:>7.2%} "
+                f"{res.profit_factor:>6.2f}"
             )
 
-        # Summary
-        train_returns = [t.total_return_pct for t, _ in wf_result.windows]
-        test_returns = [t.total_return_pct for _, t in wf_result.windows]
-        avg_train = sum(train_returns) / len(train_returns) if train_returns else 0
-        avg_test = sum(test_returns) / len(test_returns) if test_returns else 0
-
+    @staticmethod
+    def _print_footer(train: np.ndarray, test: np.ndarray):
+        avg_train = train.mean()
+        avg_test = test.mean()
         print()
         print(f"  Avg Train Return: {avg_train:+.2%}")
         print(f"  Avg Test Return:  {avg_test:+.2%}")
         if avg_train != 0:
             ratio = avg_test / avg_train
             print(f"  Test/Train Ratio: {ratio:.2f}  (>0.5 = reasonable generalization)")
+        if len(train) > 1:
+            print(f"  Return Std Dev:   {train.std(ddof=1):.2%} train | {test.std(ddof=1):.2%} test")
+            if train.std() > 0 and test.std() > 0:
+                corr = np.corrcoef(train, test)[0, 1]
+                print(f"  Train/Test Corr:  {corr:+.2f}")
         print("=" * 90)
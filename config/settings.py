@@ -1,7 +1,11 @@
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
+# load_dotenv never overrides existing variables, so once a parent process has
+# parsed .env its children (spawned pool workers) inherit the values and skip it
+if not os.environ.get("_CRYPTOTRADER_DOTENV_LOADED"):
+    load_dotenv()
+    os.environ["_CRYPTOTRADER_DOTENV_LOADED"] = "1"
 
 # Exchange
 BINANCE_API_KEY = os.getenv("BINANCE_API_KEY", "")
@@ -585,15 +585,7 @@ class TradingBot:
     ):
         try:
             # Dynamic risk checks: cooldown, frequency, post-profit, clustering
-            if self.risk_manager.check_cooldown(symbol, self._tick_counter):
-                return
-            if self.risk_manager.check_pair_streak_cooldown(symbol, self._tick_counter):
-                return
-            if self.risk_manager.check_trade_frequency(self._tick_counter):
-                return
-            if self.risk_manager.check_post_profit_cooldown(symbol, self._tick_counter):
-                return
-            if self.risk_manager.check_trade_clustering(self._tick_counter):
+            if self.risk_manager.check_entry_blocked(symbol, self._tick_counter):
                 return
 
             df = self.fetcher.fetch_ohlcv(
@@ -67,6 +67,9 @@ class Portfolio:
     def __init__(self, initial_balance: float = 100.0):
         self.initial_balance = initial_balance
         self.positions: dict[str, Position] = {}
+        # Bumped whenever a position is opened or removed, so callers can cache
+        # per-position arrays (side, entry, symbol slot) until the set changes
+        self.layout_version = 0
 
     @property
     def open_position_count(self) -> int:
@@ -77,6 +80,7 @@ class Portfolio:
 
     def add_position(self, position: Position):
         self.positions[position.symbol] = position
+        self.layout_version += 1
         logger.info(
             f"Position opened: {position.side} {position.quantity:.6f} {position.symbol} "
             f"@ ${position.entry_price:.2f} | SL: ${position.stop_loss:.2f} | "
@@ -86,6 +90,7 @@ class Portfolio:
     def remove_position(self, symbol: str) -> Position | None:
         pos = self.positions.pop(symbol, None)
         if pos:
+            self.layout_version += 1
             logger.info(f"Position closed: {symbol}")
         return pos
 
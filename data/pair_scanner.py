@@ -9,6 +9,9 @@ from utils.logger import setup_logger
 
 logger = setup_logger("pair_scanner")
 
+# Bars back for the directional-quality net move
+DIRECTIONAL_LOOKBACK = 12
+
 
 class PairScanner:
     """
@@ -40,24 +43,41 @@ class PairScanner:
             return None
 
         latest = df.iloc[-1]
+        return self.score_values(
+            adx=latest.get(f"ADX_{settings.ADX_PERIOD}", 0),
+            volume_ratio=latest.get("volume_ratio", 1.0),
+            ema_fast=latest.get(f"ema_{settings.EMA_FAST}", 0),
+            ema_slow=latest.get(f"ema_{settings.EMA_SLOW}", 0),
+            atr=latest.get("atr", 0),
+            close_now=latest["close"],
+            close_ago=df.iloc[-DIRECTIONAL_LOOKBACK - 1]["close"] if len(df) > DIRECTIONAL_LOOKBACK else float("nan"),
+        )
 
+    def score_values(
+        self,
+        adx: float,
+        volume_ratio: float,
+        ema_fast: float,
+        ema_slow: float,
+        atr: float,
+        close_now: float,
+        close_ago: float,
+    ) -> float:
+        """
+        Composite score from the latest bar's indicator values, where close_ago
+        is the close DIRECTIONAL_LOOKBACK bars earlier (see score_pair).
+        """
         # ADX component
-        adx_col = f"ADX_{settings.ADX_PERIOD}"
-        adx = latest.get(adx_col, 0)
         if pd.isna(adx):
             adx = 0
         adx_score = min(1.0, adx / 50.0)
 
         # Volume component
-        volume_ratio = latest.get("volume_ratio", 1.0)
         if pd.isna(volume_ratio):
             volume_ratio = 1.0
         volume_score = min(1.0, volume_ratio / 3.0)
 
         # Momentum component (EMA spread normalized by ATR)
-        ema_fast = latest.get(f"ema_{settings.EMA_FAST}", 0)
-        ema_slow = latest.get(f"ema_{settings.EMA_SLOW}", 0)
-        atr = latest.get("atr", 0)
         if atr > 0 and not pd.isna(ema_fast) and not pd.isna(ema_slow):
             momentum_score = min(1.0, abs(ema_fast - ema_slow) / (atr * 3))
         else:
@@ -65,14 +85,10 @@ class PairScanner:
 
         # Directional quality: net move vs expected random walk
         directional_score = 0.0
-        lookback = 12
-        if len(df) >= lookback + 1 and atr > 0:
-            close_now = latest["close"]
-            close_ago = df.iloc[-lookback - 1]["close"]
-            if not pd.isna(close_now) and not pd.isna(close_ago):
-                net_move = abs(close_now - close_ago)
-                expected_random = atr * math.sqrt(lookback)
-                directional_score = min(1.0, net_move / expected_random) if expected_random > 0 else 0.0
+        if atr > 0 and not pd.isna(close_now) and not pd.isna(close_ago):
+            net_move = abs(close_now - close_ago)
+            expected_random = atr * math.sqrt(DIRECTIONAL_LOOKBACK)
+            directional_score = min(1.0, net_move / expected_random) if expected_random > 0 else 0.0
 
         composite = (
             self.adx_weight * adx_score
@@ -127,30 +143,41 @@ class PairScanner:
         Score all pairs and return sorted list of (symbol, score),
         highest score first.
         """
-        core = set(getattr(settings, "CORE_PAIRS", []))
-        scores = []
-
-        for symbol, df in data.items():
-            if exclude_core and symbol in core:
-                continue
-            score = self.score_pair(df)
-            if score is not None:
-                scores.append((symbol, score))
+        return self.rank_scores(
+            {symbol: self.score_pair(df) for symbol, df in data.items()}, exclude_core
+        )
 
-        scores.sort(key=lambda x: x[1], reverse=True)
-        return scores
+    def rank_scores(
+        self,
+        scores: dict[str, float | None],
+        exclude_core: bool = True,
+    ) -> list[tuple[str, float]]:
+        """rank_pairs for scores computed elsewhere (None = insufficient data)."""
+        core = set(getattr(settings, "CORE_PAIRS", []))
+        ranked = [
+            (symbol, score)
+            for symbol, score in scores.items()
+            if score is not None and not (exclude_core and symbol in core)
+        ]
+        ranked.sort(key=lambda x: x[1], reverse=True)
+        return ranked
 
     def select_active_pairs(
         self,
         data: dict[str, pd.DataFrame],
+        scores: dict[str, float | None] | None = None,
     ) -> list[str]:
         """
         Select the active pair set: CORE_PAIRS + top MAX_DYNAMIC_PAIRS.
+        Precomputed `scores` are used instead of scoring `data` when given.
         """
         core = list(getattr(settings, "CORE_PAIRS", []))
         max_dynamic = getattr(settings, "MAX_DYNAMIC_PAIRS", 5)
 
-        ranked = self.rank_pairs(data, exclude_core=True)
+        if scores is not None:
+            ranked = self.rank_scores(scores, exclude_core=True)
+        else:
+            ranked = self.rank_pairs(data, exclude_core=True)
         dynamic = [sym for sym, _ in ranked[:max_dynamic]]
 
         active = core + dynamic
@@ -198,9 +225,11 @@ class SmartPairSelector:
         min_holding_scans: int = 2,
         smoothing: int = 3,
         open_positions: set[str] | None = None,
+        scores: dict[str, float | None] | None = None,
     ) -> tuple[list[str], dict]:
         """
-        Select pairs using hysteresis-based rotation.
+        Select pairs using hysteresis-based rotation. Precomputed `scores`
+        are used instead of scoring `data` when given.
 
         Returns (new_active_list, metadata_dict).
         """
@@ -209,7 +238,10 @@ class SmartPairSelector:
             open_positions = set()
 
         # 1. Score all universe pairs
-        all_scores = self.scanner.rank_pairs(data, exclude_core=False)
+        if scores is not None:
+            all_scores = self.scanner.rank_scores(scores, exclude_core=False)
+        else:
+            all_scores = self.scanner.rank_pairs(data, exclude_core=False)
         score_map = {sym: score for sym, score in all_scores}
 
         # 2. Update score history and compute smoothed scores (EMA)
@@ -35,6 +35,8 @@ python3 -m venv "$VENV_DIR"
 source "$VENV_DIR/bin/activate"
 pip install --upgrade pip -q
 pip install -r "$APP_DIR/requirements.txt" -q
+# Compile the numba kernels once so the first bot tick/backtest doesn't pay the JIT
+(cd "$APP_DIR" && python -m backtest._kernels)
 
 # 5. Ensure data directory exists
 echo "[5/6] Setting up data directory..."
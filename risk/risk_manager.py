@@ -4,6 +4,8 @@ from utils.logger import setup_logger
 
 logger = setup_logger("risk_manager")
 
+_TF_MINUTES = {"1m": 1, "3m": 3, "5m": 5, "15m": 15, "30m": 30, "1h": 60}
+
 
 class RiskManager:
     def __init__(self):
@@ -96,11 +98,26 @@ class RiskManager:
             return True
         return False
 
+    def check_entry_blocked(self, symbol: str, bar_index: int) -> bool:
+        """Return True if any pre-entry guard blocks a new trade on symbol.
+
+        Runs cooldown, pair streak, frequency, post-profit and clustering checks
+        in that order; the bar-level checks keep their window state, so they are
+        only evaluated once the per-symbol cooldowns have passed.
+        """
+        return (
+            self.check_cooldown(symbol, bar_index)
+            or self.check_pair_streak_cooldown(symbol, bar_index)
+            or self.check_trade_frequency(bar_index)
+            or self.check_post_profit_cooldown(symbol, bar_index)
+            or self.check_trade_clustering(bar_index)
+        )
+
     def check_trade_frequency(self, bar_index: int) -> bool:
         """Return True if trade frequency cap is exceeded (should block trade)."""
         # Derive bars per hour from primary timeframe
         tf = getattr(settings, "PRIMARY_TIMEFRAME", "15m")
-        tf_minutes = {"1m": 1, "3m": 3, "5m": 5, "15m": 15, "30m": 30, "1h": 60}.get(tf, 15)
+        tf_minutes = _TF_MINUTES.get(tf, 15)
         bars_per_hour = max(1, 60 // tf_minutes)
         if bar_index - self._hour_start_bar >= bars_per_hour:
             self._hour_start_bar = bar_index
@@ -10,21 +10,22 @@ import sqlite3
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from backtest.data_loader import DataLoader
+
 PAIRS = ['BTC/USDT', 'SOL/USDT', 'XRP/USDT', 'DOGE/USDT', 'AVAX/USDT',
          'SUI/USDT', 'RENDER/USDT', 'AXS/USDT', 'ZEC/USDT']
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'historical')
 
 START = '2026-02-13'
 END = '2026-02-20'
 
 def load_15m_data(symbol):
     """Load 15m candle data, try both naming conventions."""
-    for fmt in [f"{symbol.replace('/', '_')}_15m.csv",
-                f"{symbol.replace('/', '_')}:USDT_15m.csv"]:
-        fpath = os.path.join(DATA_DIR, fmt)
-        if os.path.exists(fpath):
-            df = pd.read_csv(fpath, parse_dates=['timestamp'])
+    loader = DataLoader()
+    for name in [symbol, f"{symbol}:USDT"]:
+        df = loader.load_cached(name, '15m')
+        if not df.empty:
+            df = df.reset_index()
             df = df[(df['timestamp'] >= START) & (df['timestamp'] < END + ' 23:59:59')]
             df = df.sort_values('timestamp').reset_index(drop=True)
             if len(df) > 0:
@@ -16,17 +16,15 @@ import sqlite3
 import pandas as pd
 from datetime import datetime, timedelta, timezone
 
+from backtest.data_loader import DataLoader
+
 DB_PATH = "data/trades.db"
-DATA_DIR = "data/historical"
 TF = "15m"
 
 def load_ohlcv(symbol):
-    fname = symbol.replace("/", "_") + f"_{TF}.csv"
-    path = os.path.join(DATA_DIR, fname)
-    if not os.path.exists(path):
+    df = DataLoader().load_cached(symbol, TF)
+    if df.empty:
         return None
-    df = pd.read_csv(path, parse_dates=["timestamp"])
-    df = df.set_index("timestamp")
     return df
 
 def parse_ts(s):
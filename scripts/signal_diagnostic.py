@@ -30,7 +30,6 @@ from analysis.indicators import add_all_indicators as add_indicators, get_higher
 from backtest.data_loader import DataLoader
 from strategies.base import Signal
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'historical')
 START = '2026-02-13'
 END = '2026-02-20'
 
@@ -58,12 +57,8 @@ TOP_MOVES = [
 
 def load_data(symbol, timeframe):
     """Load cached data."""
-    fname = f"{symbol.replace('/', '_')}_{timeframe}.csv"
-    fpath = os.path.join(DATA_DIR, fname)
-    if not os.path.exists(fpath):
-        return None
-    df = pd.read_csv(fpath, parse_dates=['timestamp'], index_col='timestamp')
-    return df
+    df = DataLoader().load_cached(symbol, timeframe)
+    return None if df.empty else df
 
 def diagnose_move(symbol, direction, entry_time_str, move_pct):
     """Trace the signal pipeline for a specific move."""
@@ -15,8 +15,9 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from backtest.data_loader import DataLoader
+
 DB_PATH = "data/trades.db"
-DATA_DIR = "data/historical"
 
 def parse_ts(s):
     if not s: return None
@@ -25,11 +26,8 @@ def parse_ts(s):
     except: return None
 
 def load_ohlcv(symbol, tf="15m"):
-    fname = symbol.replace("/", "_") + f"_{tf}.csv"
-    path = os.path.join(DATA_DIR, fname)
-    if not os.path.exists(path): return None
-    df = pd.read_csv(path, parse_dates=["timestamp"])
-    return df.set_index("timestamp")
+    df = DataLoader().load_cached(symbol, tf)
+    return None if df.empty else df
 
 def ema(series, n):
     return series.ewm(span=n, adjust=False).mean()
@@ -26,7 +26,9 @@ class BreakoutStrategy(BaseStrategy):
         obv = latest.get("obv", 0)
         obv_ema = latest.get("obv_ema", 0)
 
-        support_levels, resistance_levels = find_support_resistance(df)
+        support_levels, resistance_levels = find_support_resistance(
+            df["high"].to_numpy(), df["low"].to_numpy()
+        )
 
         if not support_levels and not resistance_levels:
             return self._hold(symbol, df)
@@ -0,0 +1,12 @@
+"""Optional numba JIT: `njit` compiles when numba is installed, otherwise it is a no-op."""
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - numba is optional
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
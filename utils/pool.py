@@ -0,0 +1,12 @@
+"""Start method for the backtest process pools.
+
+Workers are forked so they inherit the parent's state (imported modules,
+compiled kernels, prefetched candles) and never re-import the caller's
+__main__, which many scripts/ run without an `if __name__` guard. Fork is
+only pinned on Linux; elsewhere FORK_CONTEXT is None.
+"""
+
+import multiprocessing as mp
+import sys
+
+FORK_CONTEXT = mp.get_context("fork") if sys.platform.startswith("linux") else None